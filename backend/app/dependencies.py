@@ -2,35 +2,37 @@
 import joblib
 import numpy as np
 import json
+import logging
 import os
-import tensorflow as tf
-from tensorflow import keras
+from fastapi import Depends
 from functools import lru_cache
+from typing import Optional
 
-if os.path.exists("artifacts/model.keras"):
-    model = tf.keras.models.load_model("artifacts/model.keras", compile=False)
-elif os.path.exists("artifacts/model_fixed.h5"):
-    from tensorflow.keras.utils import custom_object_scope
-    from tensorflow.keras.mixed_precision import Policy
-    with custom_object_scope({"DTypePolicy": Policy, "Policy": Policy}):
-        model = tf.keras.models.load_model("artifacts/model_fixed.h5", compile=False)
-else:
-    from tensorflow.keras.utils import custom_object_scope
-    from tensorflow.keras.mixed_precision import Policy
-    with custom_object_scope({"DTypePolicy": Policy, "Policy": Policy}):
-        model = tf.keras.models.load_model("artifacts/model.h5", compile=False)
+from app.services.batching import InferenceBatcher
+from app.services.path_store import PathStore
+from app.utils.instrumentation import span
+
+logger = logging.getLogger(__name__)
 
 
 class ModelLoader:
     def __init__(self):
-        print("Loading model artifacts...")
-        
+        logger.info("Loading model artifacts...")
+        with span("artifacts.load"):
+            self._load_artifacts()
+
+    def _load_artifacts(self):
+        # Imported here so the app (and anything overriding get_model_loader) imports without TF
+        import tensorflow as tf
+        from tensorflow import keras
+
         # Load pre-trained assets with error handling
         try:
             # Try loading with compile=False to avoid optimizer/version issues
-            print("Attempting to load model...")
-            self.model = keras.models.load_model("artifacts/model.h5", compile=False)
-            print("Model loaded successfully!")
+            logger.info("Attempting to load model...")
+            with span("artifacts.load_model"):
+                self.model = keras.models.load_model("artifacts/model.h5", compile=False)
+            logger.info("Model loaded successfully!")
             
             # Manually compile the model
             self.model.compile(
@@ -39,8 +41,8 @@ class ModelLoader:
             )
             
         except Exception as e:
-            print(f"Error loading model: {e}")
-            print("Attempting alternative loading method...")
+            logger.warning("Error loading model: %s", e)
+            logger.info("Attempting alternative loading method...")
             
             try:
                 # Alternative loading method
@@ -56,25 +58,40 @@ class ModelLoader:
                     optimizer='adam',
                     loss='mean_squared_error'
                 )
-                print("Model loaded with alternative method!")
+                logger.info("Model loaded with alternative method!")
                 
             except Exception as e2:
-                print(f"Alternative method also failed: {e2}")
+                logger.error("Alternative method also failed: %s", e2)
                 raise Exception(f"Could not load model. Try retraining with updated script. Original error: {e}")
         
         # Load other artifacts
         try:
             self.scaler = joblib.load("artifacts/scaler.pkl")
-            print("Scaler loaded successfully!")
+            logger.info("Scaler loaded successfully!")
         except Exception as e:
-            print(f"Error loading scaler: {e}")
+            logger.error("Error loading scaler: %s", e)
             raise
             
         try:
             self.initial_window = np.load("artifacts/initial_window.npy")
-            print("Initial window loaded successfully!")
+            logger.info("Initial window loaded successfully!")
         except Exception as e:
-            print(f"Error loading initial window: {e}")
+            logger.error("Error loading initial window: %s", e)
+            raise
+
+        # Load scenario anchor windows (optional): stacked (S, lookback, N) + names
+        try:
+            if os.path.exists("artifacts/scenarios.npz"):
+                with np.load("artifacts/scenarios.npz") as scenarios:
+                    self.scenario_names = [str(name) for name in scenarios["names"]]
+                    self.scenario_windows = scenarios["windows"]
+                logger.info("Loaded %d scenarios: %s", len(self.scenario_names), self.scenario_names)
+            else:
+                logger.warning("scenarios.npz not found. Only the 'latest' scenario is available.")
+                self.scenario_names = ["latest"]
+                self.scenario_windows = self.initial_window[np.newaxis]
+        except Exception as e:
+            logger.error("Error loading scenarios: %s", e)
             raise
         
         # Load ticker information
@@ -84,15 +101,15 @@ class ModelLoader:
                     ticker_data = json.load(f)
                     self.all_tickers = ticker_data["all_tickers"]
                     self.close_cols = ticker_data["close_cols"]
-                print(f"Loaded {len(self.all_tickers)} tickers: {self.all_tickers}")
+                logger.info("Loaded %d tickers: %s", len(self.all_tickers), self.all_tickers)
             else:
                 # Fallback: create a default ticker list
-                print("Warning: tickers.json not found. Using default tickers.")
+                logger.warning("tickers.json not found. Using default tickers.")
                 self.all_tickers = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'META', 'NVDA', 'JPM', 'JNJ', 'V']
                 self.close_cols = [f"{ticker}_close" for ticker in self.all_tickers]
                 
         except Exception as e:
-            print(f"Error loading tickers: {e}")
+            logger.error("Error loading tickers: %s", e)
             raise
     
     def get_stock_indices(self, selected_tickers):
@@ -103,7 +120,7 @@ class ModelLoader:
             if col in self.close_cols:
                 indices.append(self.close_cols.index(col))
             else:
-                print(f"Warning: {ticker} not found in available stocks: {self.all_tickers}")
+                logger.warning("%s not found in available stocks: %s", ticker, self.all_tickers)
         
         if not indices:
             raise ValueError(f"None of the selected stocks {selected_tickers} are available. Available stocks: {self.all_tickers}")
@@ -113,4 +130,27 @@ class ModelLoader:
 
 @lru_cache(maxsize=1)
 def get_model_loader() -> ModelLoader:
-    return ModelLoader()
\ No newline at end of file
+    return ModelLoader()
+
+@lru_cache(maxsize=1)
+def get_inference_batcher(loader: ModelLoader = Depends(get_model_loader)) -> Optional[InferenceBatcher]:
+    """Shared micro-batching scheduler; disabled with PORTFOLIO_BATCHING=0."""
+    if os.environ.get("PORTFOLIO_BATCHING", "1") == "0":
+        return None
+    return InferenceBatcher(
+        loader.model,
+        max_batch_size=int(os.environ.get("PORTFOLIO_BATCH_MAX_SIZE", "4096")),
+        max_wait_ms=float(os.environ.get("PORTFOLIO_BATCH_WAIT_MS", "2.0")),
+    )
+
+@lru_cache(maxsize=1)
+def get_path_store() -> PathStore:
+    """Disk cache of simulated path sets for bulk export (PORTFOLIO_PATH_CACHE)."""
+    # Tag cache files with the model's mtime so a retrained model never serves stale paths
+    tag = str(int(os.path.getmtime("artifacts/model.h5"))) if os.path.exists("artifacts/model.h5") else ""
+    return PathStore(
+        os.environ.get("PORTFOLIO_PATH_CACHE", "artifacts/path_cache"),
+        tag=tag,
+        max_set_bytes=int(os.environ.get("PORTFOLIO_PATH_MAX_SET_BYTES", str(2 * 1024 ** 3))),
+        max_cache_bytes=int(os.environ.get("PORTFOLIO_PATH_CACHE_BYTES", str(20 * 1024 ** 3))),
+    )
@@ -1,6 +1,8 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.routes.portfolio import router as portfolio_router
+from app.utils import instrumentation
 
 app = FastAPI(
     title="Portfolio Optimizer API",
@@ -19,6 +21,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request Server-Timing headers (PORTFOLIO_TIMING_HEADERS=1)
+if instrumentation.ENABLED and instrumentation.TIMING_HEADERS:
+    @app.middleware("http")
+    async def server_timing(request: Request, call_next):
+        with instrumentation.collect_request_spans() as spans:
+            with instrumentation.span("request"):
+                response = await call_next(request)
+        response.headers["Server-Timing"] = instrumentation.server_timing_header(spans)
+        return response
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(
+        instrumentation.registry.render(),
+        media_type="text/plain; version=0.0.4",
+    )
+
 # Include routes
 @app.get("/")
 def health_check():
@@ -1,15 +1,22 @@
 # backend/app/routes/portfolio.py
-from fastapi import APIRouter, HTTPException, Request
-from pydantic import BaseModel
-from typing import Dict, List, Optional
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Dict, List, Literal, Optional
 
 from app.dependencies import ModelLoader
 from app.services.simulation import MonteCarloSimulator
 from app.services.optimizer import PortfolioOptimizer
-from app.utils.serialization import to_py
+from app.utils.serialization import (
+    ARROW_STREAM_MEDIA_TYPE, NPY_MEDIA_TYPE, NPZ_MEDIA_TYPE,
+    iter_arrow_chunks, iter_npy_chunks, to_json_bytes, to_npz_bytes,
+)
+from app.utils.instrumentation import span
 
 from fastapi import APIRouter, Depends
-from app.dependencies import get_model_loader, ModelLoader
+from app.dependencies import get_inference_batcher, get_model_loader, get_path_store, ModelLoader
+from app.services.batching import InferenceBatcher
+from app.services.path_store import PathStore
 from app.services.simulation import MonteCarloSimulator
 from app.services.optimizer import PortfolioOptimizer
 
@@ -19,6 +26,27 @@ class OptimizeRequest(BaseModel):
     selected_stocks: List[str]
     total_capital: float
     custom_weights: Optional[List[float]] = None
+    # Number of points to keep per growth curve (server-side downsampling)
+    resolution: Optional[int] = Field(default=None, ge=2)
+    # "sharpe": exact mean per-path Sharpe (what the response reports);
+    # "mean_sharpe_cm" / "max_sharpe": faster constant-mix solves on the moment index
+    objective: Literal["sharpe", "mean_sharpe_cm", "max_sharpe"] = "sharpe"
+    # Longest a rollout step may wait to share a model forward pass with other requests
+    max_batch_wait_ms: Optional[float] = Field(default=None, ge=0, le=100)
+    # Named anchor windows to simulate from (see GET /scenarios); default is the latest window
+    scenarios: Optional[List[str]] = None
+
+class ExportPathsRequest(BaseModel):
+    # Ticker subset to export; omit for every ticker
+    tickers: Optional[List[str]] = None
+    scenario: str = "latest"
+    n_paths: int = Field(default=1000, ge=1, le=1_000_000)
+    horizon: int = Field(default=75, ge=1, le=1000)
+    seed: int = 0
+    # Half-open range of paths to export, within [0, n_paths)
+    path_start: int = Field(default=0, ge=0)
+    path_stop: Optional[int] = None
+    format: Literal["npy", "arrow"] = "npy"
 
 class OptimizeResponse(BaseModel):
     allocations: Dict[str, float]
@@ -27,15 +55,91 @@ class OptimizeResponse(BaseModel):
     sharpe: float
     frontier: List[List[float]]
     growth_data: Dict[str, List[float]]
+    scenarios: Optional[Dict[str, Dict[str, float]]] = None
+
+def render(result, accept: str) -> Response:
+    """Encode a result dict straight from numpy, negotiating JSON or .npz via `Accept`."""
+    with span("serialization"):
+        if NPZ_MEDIA_TYPE in accept:
+            return Response(to_npz_bytes(result), media_type=NPZ_MEDIA_TYPE)
+        return Response(to_json_bytes(result), media_type="application/json")
 
-@router.post("/optimize", response_model=OptimizeResponse)
-def optimize(req: OptimizeRequest, loader: ModelLoader = Depends(get_model_loader)):
-    sim = MonteCarloSimulator(loader)
+@router.post(
+    "/optimize",
+    response_model=OptimizeResponse,
+    responses={200: {"content": {NPZ_MEDIA_TYPE: {}}}},
+)
+def optimize(
+    req: OptimizeRequest,
+    request: Request,
+    loader: ModelLoader = Depends(get_model_loader),
+    batcher: Optional[InferenceBatcher] = Depends(get_inference_batcher),
+):
+    sim = MonteCarloSimulator(loader, predictor=batcher, max_wait_ms=req.max_batch_wait_ms)
     opt = PortfolioOptimizer(loader, sim)
-    raw = opt.optimize(
-        tickers=req.selected_stocks, 
-        total_capital=req.total_capital,
-        custom_weights=req.custom_weights
-    )
-    clean = to_py(raw)
-    return OptimizeResponse(**clean)
\ No newline at end of file
+    try:
+        raw = opt.optimize(
+            tickers=req.selected_stocks, 
+            total_capital=req.total_capital,
+            custom_weights=req.custom_weights,
+            resolution=req.resolution,
+            objective=req.objective,
+            scenarios=req.scenarios,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # `response_model` documents the schema; the result is encoded once, without re-validation
+    return render(raw, request.headers.get("accept", ""))
+
+@router.get("/scenarios")
+def scenarios(loader: ModelLoader = Depends(get_model_loader)):
+    return {"scenarios": list(loader.scenario_names)}
+
+@router.post(
+    "/paths/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {NPY_MEDIA_TYPE: {}, ARROW_STREAM_MEDIA_TYPE: {}}}},
+)
+def export_paths(
+    req: ExportPathsRequest,
+    loader: ModelLoader = Depends(get_model_loader),
+    batcher: Optional[InferenceBatcher] = Depends(get_inference_batcher),
+    store: PathStore = Depends(get_path_store),
+):
+    """Stream a (paths, horizon, tickers) float32 path set, from cache or freshly simulated."""
+    path_stop = req.n_paths if req.path_stop is None else req.path_stop
+    if not req.path_start < path_stop <= req.n_paths:
+        raise HTTPException(status_code=400, detail=f"Invalid path range [{req.path_start}, {path_stop}) for {req.n_paths} paths")
+    tickers = req.tickers or list(loader.all_tickers)
+    # Exported columns must match the request exactly; never drop unknown tickers silently
+    unknown = [ticker for ticker in tickers if f"{ticker}_close" not in loader.close_cols]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown tickers {unknown}. Available stocks: {loader.all_tickers}")
+    try:
+        columns = loader.get_stock_indices(tickers)
+        paths = store.get_or_create(
+            MonteCarloSimulator(loader, predictor=batcher),
+            scenario=req.scenario, n_paths=req.n_paths, horizon=req.horizon, seed=req.seed,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    schema = {
+        "tickers": ",".join(tickers),
+        "horizon": req.horizon,
+        "seed": req.seed,
+        "scenario": req.scenario,
+        "paths": f"{req.path_start}-{path_stop}",
+    }
+    if req.format == "arrow":
+        try:
+            body = iter_arrow_chunks(paths, (req.path_start, path_stop), columns, tickers, schema)
+        except RuntimeError as e:
+            raise HTTPException(status_code=501, detail=str(e))
+        media_type, suffix = ARROW_STREAM_MEDIA_TYPE, "arrows"
+    else:
+        body = iter_npy_chunks(paths, (req.path_start, path_stop), columns)
+        media_type, suffix = NPY_MEDIA_TYPE, "npy"
+    headers = {f"X-Paths-{key.title()}": str(value) for key, value in schema.items()}
+    headers["Content-Disposition"] = f'attachment; filename="paths_{req.scenario}_s{req.seed}.{suffix}"'
+    return StreamingResponse(body, media_type=media_type, headers=headers)
@@ -0,0 +1,179 @@
+# backend/app/services/backtest.py
+import numpy as np
+
+try:
+    import pandas as pd
+except Exception:  # pandas optional
+    pd = None
+
+# Fraction of training sequences used for fitting (training/train_model.py)
+TRAIN_TEST_SPLIT = 0.8
+
+
+def load_close_matrix(file_path, close_cols):
+    """Load historical closes as a (T, N) array ordered like `close_cols`."""
+    if pd is None:
+        raise RuntimeError("pandas is required to load historical data.")
+    df = pd.read_csv(file_path, index_col='timestamp', parse_dates=True)
+    df = df.iloc[:, 1:]  # Remove empty first column
+    df = df.ffill().bfill()  # Fill missing values
+    missing = [col for col in close_cols if col not in df.columns]
+    if missing:
+        raise ValueError(f"Historical data is missing columns: {missing}")
+    return df[close_cols].to_numpy(dtype=np.float64)
+
+
+def out_of_sample_start(n_days, lookback, train_fraction=TRAIN_TEST_SPLIT):
+    """First day of the test split when the model was trained on this same history.
+
+    Training fits on the first `train_fraction` of the `n_days - lookback`
+    one-day targets, so anchors from this day on forecast unseen days.
+    """
+    return lookback + int(train_fraction * (n_days - lookback))
+
+
+class WalkForwardBacktester:
+    """Score optimizer allocations against realized forward returns.
+
+    The model's lookback window is slid across the historical close matrix.
+    Every anchor is simulated in one batched rollout, weights are optimized
+    per anchor on its own paths, and the resulting portfolio is held over the
+    realized `horizon` days that followed the anchor.
+
+    Anchors start at `start` (default: the first day with a full lookback).
+    When `closes` is the training history, pass `out_of_sample_start(...)`
+    so the scores aren't inflated by days the model was fit on.
+    """
+
+    def __init__(self, model_loader, simulator, optimizer, *, horizon=20, step=5,
+                 n_paths=32, noise_std=0.01, anchors_per_batch=64, objective="sharpe"):
+        self.model_loader = model_loader
+        self.simulator = simulator
+        self.optimizer = optimizer
+        self.horizon = horizon
+        self.step = step
+        self.n_paths = n_paths
+        self.noise_std = noise_std
+        self.anchors_per_batch = anchors_per_batch
+        self.objective = objective
+
+    @property
+    def lookback(self):
+        return self.model_loader.initial_window.shape[0]
+
+    def anchor_indices(self, n_days, start=None):
+        """Days t >= start whose window closes[t - lookback:t] has `horizon` realized days after it."""
+        first = self.lookback if start is None else max(self.lookback, start)
+        return np.arange(first, n_days - self.horizon + 1, self.step)
+
+    def anchor_windows(self, closes, anchors):
+        """Scaled (A, lookback, N) windows ending just before each anchor."""
+        scaled = np.asarray(self.model_loader.scaler.transform(closes), dtype=np.float32)
+        # (T - lookback + 1, N, lookback) view, no copy until indexed
+        views = np.lib.stride_tricks.sliding_window_view(scaled, self.lookback, axis=0)
+        return views[anchors - self.lookback].transpose(0, 2, 1)
+
+    def simulate_anchors(self, windows):
+        """Batch-simulate `n_paths` paths from every window: (A, P, horizon, N)."""
+        batch = np.repeat(windows, self.n_paths, axis=0)
+        paths = self.simulator.simulate_batch(batch, self.horizon, self.noise_std)
+        return paths.reshape(len(windows), self.n_paths, self.horizon, -1)
+
+    def realized_paths(self, closes, anchors):
+        """Realized closes from the last observed day through the horizon: (A, horizon + 1, N)."""
+        offsets = np.arange(-1, self.horizon)
+        return closes[anchors[:, None] + offsets[None, :]]
+
+    def run(self, closes, stock_indices, start=None):
+        """Walk forward over `closes` (T, N) from day `start` and score allocations for `stock_indices`."""
+        closes = np.asarray(closes, dtype=np.float64)
+        stock_indices = list(stock_indices)
+        anchors = self.anchor_indices(len(closes), start)
+        if len(anchors) == 0:
+            first = self.lookback if start is None else max(self.lookback, start)
+            raise ValueError(
+                f"Need at least {first + self.horizon} days of history, got {len(closes)}."
+            )
+
+        n = len(stock_indices)
+        weights = np.empty((len(anchors), n))
+        expected_return = np.empty(len(anchors))
+        for start in range(0, len(anchors), self.anchors_per_batch):
+            chunk = anchors[start:start + self.anchors_per_batch]
+            sims = self.simulate_anchors(self.anchor_windows(closes, chunk))
+            for offset, paths in enumerate(sims):
+                w = self.optimizer.solve_weights(paths, stock_indices, self.objective)
+                weights[start + offset] = w
+                # Measure from the last observed close, like the realized side
+                last_close = np.broadcast_to(closes[chunk[offset] - 1], (len(paths), 1, closes.shape[1]))
+                anchored = np.concatenate([last_close, paths], axis=1)
+                expected_return[start + offset] = np.mean(
+                    self.optimizer.batch_total_return(anchored, w, stock_indices)
+                )
+
+        realized = self.realized_paths(closes, anchors)[:, :, stock_indices]  # (A, H+1, k)
+        equal = np.full((len(anchors), n), 1.0 / n)
+        realized_return, realized_sharpe = self._score(realized, weights)
+        equal_return, equal_sharpe = self._score(realized, equal)
+
+        summary = {
+            "n_anchors": int(len(anchors)),
+            "first_anchor": int(anchors[0]),
+            "hit_rate": float(np.mean(np.sign(expected_return) == np.sign(realized_return))),
+            "beat_equal_weight_rate": float(np.mean(realized_return > equal_return)),
+            "mean_expected_return": float(np.mean(expected_return)),
+            "mean_realized_return": float(np.mean(realized_return)),
+            "realized_sharpe": float(np.mean(realized_sharpe)),
+            "equal_weight_realized_sharpe": float(np.mean(equal_sharpe)),
+        }
+        return {
+            "anchors": anchors,
+            "weights": weights,
+            "expected_return": expected_return,
+            "realized_return": realized_return,
+            "realized_sharpe": realized_sharpe,
+            "equal_weight_return": equal_return,
+            "summary": summary,
+        }
+
+    @staticmethod
+    def _score(realized, weights):
+        """Total return and per-day Sharpe of each anchor's held portfolio."""
+        port_values = np.einsum("ahk,ak->ah", realized, weights)
+        rets = np.diff(port_values, axis=1) / port_values[:, :-1]
+        total = port_values[:, -1] / port_values[:, 0] - 1.0
+        sharpe = np.mean(rets, axis=1) / (np.std(rets, axis=1) + 1e-8)
+        return total, sharpe
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from app.dependencies import get_model_loader
+    from app.services.optimizer import PortfolioOptimizer
+    from app.services.simulation import MonteCarloSimulator
+
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the portfolio optimizer")
+    parser.add_argument("data", help="CSV of historical prices (same layout as training data)")
+    parser.add_argument("--tickers", nargs="+", required=True)
+    parser.add_argument("--horizon", type=int, default=20)
+    parser.add_argument("--step", type=int, default=5)
+    parser.add_argument("--paths", type=int, default=32)
+    parser.add_argument("--start", type=int, default=None,
+                        help="first anchor day (row of the CSV); default: the out-of-sample "
+                             "test split, assuming the model was trained on this CSV. "
+                             "Use 0 to include the training period.")
+    parser.add_argument("--objective", choices=["sharpe", "mean_sharpe_cm", "max_sharpe"], default="sharpe")
+    args = parser.parse_args()
+
+    loader = get_model_loader()
+    sim = MonteCarloSimulator(loader)
+    backtester = WalkForwardBacktester(
+        loader, sim, PortfolioOptimizer(loader, sim),
+        horizon=args.horizon, step=args.step, n_paths=args.paths, objective=args.objective,
+    )
+    closes = load_close_matrix(args.data, loader.close_cols)
+    start = args.start if args.start is not None else out_of_sample_start(len(closes), backtester.lookback)
+    result = backtester.run(closes, loader.get_stock_indices(args.tickers), start=start)
+    print(json.dumps(result["summary"], indent=2))
@@ -0,0 +1,150 @@
+# backend/app/services/batching.py
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from app.utils.instrumentation import span
+
+
+class _PendingBatch:
+    __slots__ = ("inputs", "deadline", "in_session", "done", "result", "error")
+
+    def __init__(self, inputs, deadline, in_session):
+        self.inputs = inputs
+        self.deadline = deadline
+        self.in_session = in_session
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class InferenceBatcher:
+    """Coalesce concurrent `predict` calls into shared model forward passes.
+
+    Each caller's (b, lookback, n_features) batch is queued; a single worker
+    thread gathers queued batches until `max_batch_size` rows are waiting,
+    the earliest caller's latency cap expires, or every open simulation
+    session has a step queued. It then runs one `model.predict` over the
+    concatenation and hands each caller back its own rows.
+    """
+
+    def __init__(self, model, max_batch_size=4096, max_wait_ms=2.0):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending = []
+        self._active_sessions = 0
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._worker = None
+        self._closed = False
+
+    @contextmanager
+    def session(self):
+        """Mark the current thread as a rollout that will keep submitting steps.
+
+        While every open session has a step queued, the batch is flushed
+        without waiting for the latency cap.
+        """
+        with self._cond:
+            self._active_sessions += 1
+        self._local.in_session = True
+        try:
+            yield self
+        finally:
+            self._local.in_session = False
+            with self._cond:
+                self._active_sessions -= 1
+                self._cond.notify()
+
+    def predict(self, inputs, max_wait_ms=None):
+        """Queue `inputs` for the next shared forward pass and block for its rows.
+
+        `max_wait_ms` can only lower the batcher's latency cap, never raise it.
+        """
+        wait_ms = self.max_wait_ms if max_wait_ms is None else min(self.max_wait_ms, max_wait_ms)
+        pending = _PendingBatch(
+            np.asarray(inputs, dtype=np.float32),
+            time.monotonic() + wait_ms / 1000.0,
+            getattr(self._local, "in_session", False),
+        )
+        with self._cond:
+            self._ensure_worker()
+            self._pending.append(pending)
+            self._cond.notify()
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def close(self):
+        """Stop the worker thread once queued batches are done.
+
+        The batcher stays usable: the next `predict` starts a new worker.
+        """
+        with self._cond:
+            self._closed = True
+            worker = self._worker
+            self._cond.notify_all()
+        if worker is not None and worker is not threading.current_thread():
+            worker.join()
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._closed = False
+            self._worker = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+            self._worker.start()
+
+    def _ready(self):
+        rows = sum(len(p.inputs) for p in self._pending)
+        if rows >= self.max_batch_size:
+            return True
+        if self._active_sessions and sum(p.in_session for p in self._pending) >= self._active_sessions:
+            return True
+        return time.monotonic() >= min(p.deadline for p in self._pending)
+
+    def _take(self):
+        """Pop queued batches up to the size cap (always at least one)."""
+        taken, rows = [], 0
+        while self._pending:
+            size = len(self._pending[0].inputs)
+            if taken and rows + size > self.max_batch_size:
+                break
+            taken.append(self._pending.pop(0))
+            rows += size
+        return taken
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    # Closed and drained; clear the slot so the next predict starts a worker
+                    if self._worker is threading.current_thread():
+                        self._worker = None
+                    return
+                while not self._ready():
+                    timeout = min(p.deadline for p in self._pending) - time.monotonic()
+                    self._cond.wait(max(timeout, 0.0))
+                batch = self._take()
+            self._forward(batch)
+
+    def _forward(self, batch):
+        try:
+            with span("inference.batch"):
+                inputs = np.concatenate([p.inputs for p in batch], axis=0)
+                outputs = np.asarray(
+                    self.model.predict(inputs, batch_size=len(inputs), verbose=0), dtype=np.float32
+                )
+            splits = np.cumsum([len(p.inputs) for p in batch])[:-1]
+            for pending, result in zip(batch, np.split(outputs, splits)):
+                pending.result = result
+        except Exception as e:
+            for pending in batch:
+                pending.error = e
+        finally:
+            for pending in batch:
+                pending.done.set()
@@ -0,0 +1,70 @@
+# backend/app/services/moments.py
+import numpy as np
+
+
+class ReturnMomentIndex:
+    """Per-path daily-return moments for the assets of a simulated path set.
+
+    Built from a (P, T, N) price tensor, either for the full universe or for
+    a subset of `columns`. A full-universe index is worth building only for
+    a path set that is kept and queried for several ticker subsets: each
+    query is then a sub-matrix lookup plus k x k algebra. For a one-off
+    solve, build just the requested columns (O(P*T*k^2) instead of N^2).
+
+    Moments assume a daily-rebalanced (constant-mix) portfolio, whose daily
+    return is `returns @ weights`.
+    """
+
+    def __init__(self, returns, means, covs, columns=None):
+        self.returns = returns      # (P, T-1, N) daily simple returns
+        self.means = means          # (P, N)
+        self.covs = covs            # (P, N, N), population covariance
+        # Asset index of each column in the path set; None for the full universe
+        self.columns = None if columns is None else [int(c) for c in columns]
+
+    @classmethod
+    def from_paths(cls, paths, columns=None):
+        paths = np.asarray(paths)
+        if columns is not None:
+            paths = paths[:, :, list(columns)]
+        paths = np.asarray(paths, dtype=np.float64)
+        returns = np.diff(paths, axis=1) / paths[:, :-1]
+        means = returns.mean(axis=1)
+        centered = returns - means[:, None, :]
+        covs = np.einsum("ptn,ptm->pnm", centered, centered) / returns.shape[1]
+        return cls(returns, means, covs, columns)
+
+    @property
+    def n_paths(self):
+        return self.means.shape[0]
+
+    def covers(self, stock_indices=None):
+        """Whether lookups for `stock_indices` (None: every asset) can be served."""
+        if self.columns is None:
+            return True
+        return stock_indices is not None and set(stock_indices) <= set(self.columns)
+
+    def _positions(self, stock_indices):
+        if self.columns is None:
+            return np.asarray(stock_indices)
+        position = {column: i for i, column in enumerate(self.columns)}
+        return np.array([position[i] for i in stock_indices])
+
+    def subset(self, stock_indices):
+        """Per-path (P, k) means and (P, k, k) covariances for `stock_indices`."""
+        idx = self._positions(stock_indices)
+        return self.means[:, idx], self.covs[:, idx[:, None], idx[None, :]]
+
+    def pooled(self, stock_indices):
+        """Mean (k,) and covariance (k, k) pooled over paths (law of total covariance)."""
+        means, covs = self.subset(stock_indices)
+        mu = means.mean(axis=0)
+        between = np.cov(means, rowvar=False, bias=True).reshape(len(mu), len(mu))
+        return mu, covs.mean(axis=0) + between
+
+    def path_sharpe(self, weights, stock_indices):
+        """Per-path Sharpe of the constant-mix portfolio, from moments alone."""
+        means, covs = self.subset(stock_indices)
+        mean = means @ weights
+        var = np.einsum("i,pij,j->p", weights, covs, weights)
+        return mean / (np.sqrt(np.maximum(var, 0.0)) + 1e-8)
@@ -1,11 +1,21 @@
 # backend/app/services/optimizer.py
+import logging
+
 import numpy as np
 from scipy.optimize import minimize
 
+from app.services.moments import ReturnMomentIndex
+from app.utils.instrumentation import span
+from app.utils.serialization import downsample
+
+logger = logging.getLogger(__name__)
+
 class PortfolioOptimizer:
     def __init__(self, model_loader, simulator):
         self.model_loader = model_loader
         self.simulator = simulator
+        self._index_paths = None
+        self._index = None
 
     def evaluate_portfolio(self, prices, weights, stock_indices):
         """Return Sharpe for one simulated price path."""
@@ -19,24 +29,130 @@ class PortfolioOptimizer:
         port_values = np.dot(selected, weights)
         return float(port_values[-1] / port_values[0] - 1.0)
 
+    def batch_portfolio_values(self, paths, weights, stock_indices):
+        """Portfolio value over time for every path at once: (P, T, N) -> (P, T)."""
+        selected = np.asarray(paths)[:, :, stock_indices]     # (P, T, k)
+        return selected @ weights                             # (P, T)
+
+    def batch_sharpe(self, paths, weights, stock_indices):
+        """Per-path Sharpe, vectorized over a stacked (P, T, N) path set."""
+        port_values = self.batch_portfolio_values(paths, weights, stock_indices)
+        rets = np.diff(port_values, axis=1) / port_values[:, :-1]
+        return np.mean(rets, axis=1) / (np.std(rets, axis=1) + 1e-8)
+
+    def batch_total_return(self, paths, weights, stock_indices):
+        """Per-path total return, vectorized over a stacked (P, T, N) path set."""
+        port_values = self.batch_portfolio_values(paths, weights, stock_indices)
+        return port_values[:, -1] / port_values[:, 0] - 1.0
+
     def optimize_weights(self, simulated_paths, stock_indices):
         """Find weights that maximize Sharpe ratio."""
         n = len(stock_indices)
+        paths = np.asarray(simulated_paths)
 
         def objective(weights):
-            return -np.mean([
-                self.evaluate_portfolio(path, weights, stock_indices)
-                for path in simulated_paths
-            ])
+            with span("optimization.objective"):
+                return -float(np.mean(self.batch_sharpe(paths, weights, stock_indices)))
 
         constraints = {'type': 'eq', 'fun': lambda w: np.sum(w) - 1}
         bounds = [(0, 1) for _ in range(n)]
         init_w = np.ones(n) / n
 
-        res = minimize(objective, init_w, bounds=bounds, constraints=constraints)
+        with span("optimization.solve"):
+            res = minimize(objective, init_w, bounds=bounds, constraints=constraints)
+        logger.debug("optimize_weights: %s iterations, %s evaluations", res.get("nit"), res.get("nfev"))
         return res.x
 
-    def optimize(self, *, tickers=None, total_capital=None, simulated_paths=None, stock_indices=None, n_paths: int = 6, horizon: int = 75, custom_weights=None):
+    def moment_index(self, simulated_paths, stock_indices=None):
+        """Return-moment index for a path set, reused while the same set is queried.
+
+        With `stock_indices` a missing index is built for just those assets,
+        the cheap choice for one-off solves on fresh paths. Without it the
+        index covers every asset, so later subset queries on the same path
+        set are lookups.
+        """
+        if (self._index is None or self._index_paths is not simulated_paths
+                or not self._index.covers(stock_indices)):
+            with span("optimization.index"):
+                self._index = ReturnMomentIndex.from_paths(simulated_paths, stock_indices)
+            self._index_paths = simulated_paths
+        return self._index
+
+    def solve_weights(self, simulated_paths, stock_indices, objective="sharpe"):
+        """Dispatch to the weight solver for `objective`.
+
+        `sharpe` (default) is the exact `optimize_weights` objective, the same
+        buy-and-hold Sharpe that `optimize` reports. `mean_sharpe_cm` and
+        `max_sharpe` are opt-in solves on the moment index.
+        """
+        if objective == "sharpe":
+            return self.optimize_weights(simulated_paths, stock_indices)
+        return self.indexed_weights(simulated_paths, stock_indices, objective)
+
+    def indexed_weights(self, simulated_paths, stock_indices, objective="mean_sharpe_cm"):
+        """Optimize weights from the path set's moment index.
+
+        Both objectives model a daily-rebalanced (constant-mix) portfolio:
+        `mean_sharpe_cm` maximizes the mean per-path Sharpe, `max_sharpe`
+        solves the tangency QP on moments pooled over all paths. Neither
+        depends on horizon length.
+        """
+        index = self.moment_index(simulated_paths, stock_indices)
+        if objective == "mean_sharpe_cm":
+            return self._mean_sharpe_weights(index, stock_indices)
+        if objective == "max_sharpe":
+            return self._max_sharpe_weights(index, stock_indices)
+        raise ValueError(f"Unknown objective: {objective}")
+
+    @staticmethod
+    def _mean_sharpe_objective(means, covs):
+        """Negative mean constant-mix Sharpe and its gradient, from (P, k) means and (P, k, k) covs."""
+        def objective(weights):
+            with span("optimization.objective"):
+                m = means @ weights                           # (P,)
+                cov_w = covs @ weights                        # (P, k)
+                sd = np.sqrt(np.maximum(cov_w @ weights, 0.0))
+                denom = sd + 1e-8
+                sharpe = m / denom
+                # d(sharpe)/dw per path, averaged
+                grad = means / denom[:, None] - (m / denom ** 2 / np.maximum(sd, 1e-12))[:, None] * cov_w
+                return -float(np.mean(sharpe)), -grad.mean(axis=0)
+
+        return objective
+
+    def _mean_sharpe_weights(self, index, stock_indices):
+        means, covs = index.subset(stock_indices)             # (P, k), (P, k, k)
+        n = means.shape[1]
+        objective = self._mean_sharpe_objective(means, covs)
+
+        constraints = {'type': 'eq', 'fun': lambda w: np.sum(w) - 1, 'jac': lambda w: np.ones_like(w)}
+        bounds = [(0, 1) for _ in range(n)]
+        init_w = np.ones(n) / n
+
+        with span("optimization.solve"):
+            res = minimize(objective, init_w, jac=True, bounds=bounds, constraints=constraints)
+        return res.x
+
+    def _max_sharpe_weights(self, index, stock_indices):
+        mu, sigma = index.pooled(stock_indices)
+        n = len(mu)
+        bounds = [(0, None) for _ in range(n)]
+
+        with span("optimization.solve"):
+            if np.any(mu > 0):
+                # Tangency portfolio: min y'Sy s.t. mu'y = 1, y >= 0; w = y / sum(y)
+                constraints = {'type': 'eq', 'fun': lambda y: mu @ y - 1, 'jac': lambda y: mu}
+                init_y = np.where(mu > 0, 1.0, 0.0) / np.sum(mu[mu > 0])
+            else:
+                # No asset with positive drift: fall back to minimum variance
+                constraints = {'type': 'eq', 'fun': lambda y: np.sum(y) - 1, 'jac': lambda y: np.ones(n)}
+                init_y = np.ones(n) / n
+            res = minimize(lambda y: (y @ sigma @ y, 2 * sigma @ y), init_y, jac=True,
+                           bounds=bounds, constraints=constraints)
+        weights = np.maximum(res.x, 0.0)
+        return weights / np.sum(weights)
+
+    def optimize(self, *, tickers=None, total_capital=None, simulated_paths=None, stock_indices=None, n_paths: int = 6, horizon: int = 75, custom_weights=None, resolution=None, objective="sharpe", scenarios=None):
         """Wrapper so routes can call with tickers/total_capital."""
         # Resolve indices
         if stock_indices is None:
@@ -53,7 +169,12 @@ class PortfolioOptimizer:
                     raise ValueError(f"Unknown ticker in request: {e.args[0]}")
 
         # Get simulations
-        if simulated_paths is None:
+        paths_by_scenario = None
+        if simulated_paths is None and scenarios:
+            # Every scenario's paths come from one batched rollout; optimize over all of them
+            paths_by_scenario = self.simulator.simulate_scenarios(scenarios, n_paths, horizon)
+            simulated_paths = np.concatenate(list(paths_by_scenario.values()), axis=0)
+        elif simulated_paths is None:
             sim = self.simulator
             if hasattr(sim, "simulate_paths"):
                 simulated_paths = sim.simulate_paths(
@@ -75,21 +196,17 @@ class PortfolioOptimizer:
                 raise RuntimeError("Simulator must implement simulate_paths/run_simulations/run.")
 
         # Optimize weights
-        weights = self.optimize_weights(simulated_paths, stock_indices)
+        simulated_paths = np.asarray(simulated_paths)
+        weights = self.solve_weights(simulated_paths, stock_indices, objective)
 
         # Metrics
-        per_path_sharpe = np.array([
-            self.evaluate_portfolio(path, weights, stock_indices)
-            for path in simulated_paths
-        ])
-        per_path_total_ret = np.array([
-            self.path_total_return(path, weights, stock_indices)
-            for path in simulated_paths
-        ])
-
-        sharpe = float(np.mean(per_path_sharpe))
-        expected_return = float(np.mean(per_path_total_ret))
-        expected_volatility = float(np.std(per_path_total_ret, ddof=1)) if len(per_path_total_ret) > 1 else 0.0
+        with span("optimization.metrics"):
+            per_path_sharpe = self.batch_sharpe(simulated_paths, weights, stock_indices)
+            per_path_total_ret = self.batch_total_return(simulated_paths, weights, stock_indices)
+
+            sharpe = float(np.mean(per_path_sharpe))
+            expected_return = float(np.mean(per_path_total_ret))
+            expected_volatility = float(np.std(per_path_total_ret, ddof=1)) if len(per_path_total_ret) > 1 else 0.0
 
         # Map weights back to tickers the user asked for
         if tickers is None:
@@ -102,19 +219,13 @@ class PortfolioOptimizer:
         growth_data = {}
         initial_capital = total_capital if total_capital else 10000  # default capital
         
-        print(f"DEBUG: Computing growth data with initial_capital={initial_capital}")
-        print(f"DEBUG: simulated_paths shape: {len(simulated_paths)} paths")
-        print(f"DEBUG: stock_indices: {stock_indices}")
-        print(f"DEBUG: weights: {weights}")
-        
         # Always include optimized portfolio growth (as percentage)
         optimized_growth = self.compute_growth(
             simulated_paths, stock_indices, weights, initial_capital
         )
         # Convert to percentage growth from initial value
         optimized_pct_growth = ((optimized_growth / optimized_growth[0]) - 1) * 100
-        growth_data["optimized"] = optimized_pct_growth.tolist()
-        print(f"DEBUG: optimized_growth length: {len(optimized_growth)}")
+        growth_data["optimized"] = downsample(optimized_pct_growth, resolution)
         
         # Include custom weight portfolio if provided
         if custom_weights is not None:
@@ -133,10 +244,7 @@ class PortfolioOptimizer:
             )
             # Convert to percentage growth from initial value
             custom_pct_growth = ((custom_growth / custom_growth[0]) - 1) * 100
-            growth_data["custom"] = custom_pct_growth.tolist()
-            print(f"DEBUG: custom_growth length: {len(custom_growth)}")
-        
-        print(f"DEBUG: growth_data keys: {growth_data.keys()}")
+            growth_data["custom"] = downsample(custom_pct_growth, resolution)
 
         result = {
             "allocations": allocations,
@@ -146,21 +254,32 @@ class PortfolioOptimizer:
             "frontier": frontier,
             "growth_data": growth_data,
         }
-        
-        print(f"DEBUG: Final result keys: {result.keys()}")
-        print(f"DEBUG: growth_data in result: {'growth_data' in result}")
-        print(f"DEBUG: growth_data sample: {list(result['growth_data']['optimized'])[:5]}...")
+        if paths_by_scenario is not None:
+            result["scenarios"] = {
+                name: self.scenario_metrics(paths, weights, stock_indices)
+                for name, paths in paths_by_scenario.items()
+            }
         
         return result
 
+    def scenario_metrics(self, paths, weights, stock_indices):
+        """Expected return, volatility and Sharpe of `weights` over one scenario's paths."""
+        total_ret = self.batch_total_return(paths, weights, stock_indices)
+        return {
+            "expected_return": float(np.mean(total_ret)),
+            "expected_volatility": float(np.std(total_ret, ddof=1)) if len(total_ret) > 1 else 0.0,
+            "sharpe": float(np.mean(self.batch_sharpe(paths, weights, stock_indices))),
+        }
+
     def compute_growth(self, paths, stock_indices, weights, initial_capital):
         """Calculate portfolio value over time."""
-        portfolio_values = []
-        for path in paths:
-            selected = path[:, stock_indices]
-            values = np.dot(selected, weights)
-            scaled = initial_capital * (values / values[0])
-            portfolio_values.append(scaled)
+        with span("optimization.growth"):
+            portfolio_values = []
+            for path in paths:
+                selected = path[:, stock_indices]
+                values = np.dot(selected, weights)
+                scaled = initial_capital * (values / values[0])
+                portfolio_values.append(scaled)
         """path = paths[0]  # or np.random.choice(len(paths))
         selected = path[:, stock_indices]
         values = np.dot(selected, weights)
@@ -0,0 +1,160 @@
+# backend/app/services/path_store.py
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from app.utils.instrumentation import span
+
+
+class PathStore:
+    """On-disk cache of simulated path sets, served back as read-only memmaps.
+
+    A path set is a (n_paths, horizon, n_features) float32 `.npy` file keyed
+    by scenario, path count, horizon and seed. It is simulated in chunks of
+    `chunk_paths` straight into the file, so neither building nor reading it
+    holds the whole set in memory.
+
+    Sets larger than `max_set_bytes` are refused. After each build the least
+    recently used sets are deleted until the cache (including in-progress
+    builds) fits in `max_cache_bytes`; temp files left behind by crashed
+    builds are removed once they are `stale_tmp_seconds` old. A deleted set
+    stays readable by requests already streaming it, because their memmap
+    keeps the unlinked file alive.
+    """
+
+    def __init__(self, root, tag="", chunk_paths=1024,
+                 max_set_bytes=2 * 1024 ** 3, max_cache_bytes=20 * 1024 ** 3,
+                 stale_tmp_seconds=3600, n_lock_stripes=64):
+        self.root = root
+        self.tag = tag
+        self.chunk_paths = chunk_paths
+        self.max_set_bytes = max_set_bytes
+        self.max_cache_bytes = max_cache_bytes
+        self.stale_tmp_seconds = stale_tmp_seconds
+        # Guards opening sets against eviction; held only briefly
+        self._lock = threading.Lock()
+        # Fixed pool of build locks, so request-supplied keys can't grow it
+        self._build_locks = [threading.Lock() for _ in range(n_lock_stripes)]
+        self._building = set()
+
+    def path_for(self, scenario, n_paths, horizon, seed):
+        tag = f"{self.tag}_" if self.tag else ""
+        return os.path.join(self.root, f"{tag}{scenario}_p{n_paths}_h{horizon}_s{seed}.npy")
+
+    def set_bytes(self, n_paths, horizon, n_features):
+        return n_paths * horizon * n_features * np.dtype(np.float32).itemsize
+
+    def get_or_create(self, simulator, *, scenario="latest", n_paths, horizon, seed=0, noise_std=0.01):
+        """Memmap of the cached path set, simulating and caching it first if needed."""
+        # Validate before the user-supplied scenario name reaches the filesystem
+        loader = simulator.model_loader
+        names = list(loader.scenario_names)
+        if scenario not in names:
+            raise ValueError(f"Unknown scenario {scenario!r}. Available scenarios: {names}")
+        window = loader.scenario_windows[names.index(scenario)]
+        size = self.set_bytes(n_paths, horizon, window.shape[-1])
+        if size > self.max_set_bytes:
+            raise ValueError(
+                f"Path set of {size} bytes exceeds the {self.max_set_bytes} byte limit; "
+                "request fewer paths or a shorter horizon."
+            )
+
+        target = self.path_for(scenario, int(n_paths), int(horizon), int(seed))
+        with self._lock:
+            paths = self._open(target)
+        if paths is not None:
+            return paths
+        with self._build_lock(target):
+            # A set evicted by another request between build and open is simply rebuilt
+            while True:
+                if not os.path.exists(target):
+                    self._build(simulator, target, window, n_paths, horizon, seed, noise_std)
+                with self._lock:
+                    paths = self._open(target)
+                    if paths is not None:
+                        self._evict(keep=target)
+                        return paths
+
+    def _build_lock(self, target):
+        """Build lock for a path set; different sets rarely share a stripe."""
+        return self._build_locks[hash(target) % len(self._build_locks)]
+
+    def _open(self, target):
+        """Memmap `target` and mark it recently used, or None if it doesn't exist."""
+        try:
+            os.utime(target)  # mark as recently used for eviction
+            return np.load(target, mmap_mode="r")
+        except FileNotFoundError:
+            return None
+
+    def _evict(self, keep):
+        """Delete least recently used sets until the cache fits in `max_cache_bytes`.
+
+        Called with `_lock` held, so no set is deleted between a request's
+        existence check and its open.
+        """
+        if not os.path.isdir(self.root):
+            return
+        now = time.time()
+        entries, total = [], 0
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:  # removed concurrently (e.g. another worker process)
+                continue
+            if name.endswith(".tmp"):
+                if path not in self._building and now - stat.st_mtime > self.stale_tmp_seconds:
+                    self._remove(path)  # left behind by a crashed build
+                else:
+                    total += stat.st_size  # in-progress builds count, but aren't evictable
+            elif name.endswith(".npy"):
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        for _, size, path in sorted(entries):
+            if total <= self.max_cache_bytes:
+                break
+            if path == keep:
+                continue
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _build(self, simulator, target, window, n_paths, horizon, seed, noise_std):
+        rng = np.random.default_rng(seed)
+
+        os.makedirs(self.root, exist_ok=True)
+        tmp = f"{target}.{uuid.uuid4().hex}.tmp"
+        self._building.add(tmp)
+        try:
+            self._write(simulator, tmp, window, n_paths, horizon, rng, noise_std)
+        finally:
+            self._building.discard(tmp)
+        # Publish atomically so concurrent readers never see a partial file
+        os.replace(tmp, target)
+
+    def _write(self, simulator, tmp, window, n_paths, horizon, rng, noise_std):
+        out = np.lib.format.open_memmap(
+            tmp, mode="w+", dtype=np.float32, shape=(n_paths, horizon, window.shape[-1])
+        )
+        try:
+            with span("path_store.build"):
+                for start in range(0, n_paths, self.chunk_paths):
+                    stop = min(start + self.chunk_paths, n_paths)
+                    windows = np.repeat(window[np.newaxis], stop - start, axis=0)
+                    out[start:stop] = simulator.simulate_batch(windows, horizon, noise_std, rng=rng)
+            out.flush()
+        except BaseException:
+            del out
+            os.remove(tmp)
+            raise
+        del out
@@ -1,26 +1,94 @@
+from contextlib import nullcontext
+
 import numpy as np
 
+from app.utils.instrumentation import span
+
 class MonteCarloSimulator:
-    def __init__(self, model_loader):
+    def __init__(self, model_loader, predictor=None, max_wait_ms=None):
         self.model_loader = model_loader
+        # Optional shared InferenceBatcher; batched rollouts go through it
+        self.predictor = predictor
+        self.max_wait_ms = max_wait_ms
     
     def simulate_path(self, n_days=30, noise_std=0.01):
         """Generate single price path"""
         window = self.model_loader.initial_window.copy()
         path = []
         
-        for _ in range(n_days):
-            # Predict next day
-            pred = self.model_loader.model.predict(window[np.newaxis, :, :])[0]
-            # Add randomness
-            pred += np.random.normal(0, noise_std, size=pred.shape)
-            path.append(pred)
-            # Update window
-            window = np.vstack([window[1:], pred])
-        
-        # Convert to actual prices
-        return self.model_loader.scaler.inverse_transform(np.array(path))
+        with span("simulation.total"):
+            while len(path) < n_days:
+                with span("simulation.step"):
+                    # Predict next day (or next block of days for direct multi-step models)
+                    pred = self.model_loader.model.predict(window[np.newaxis, :, :])[0]
+                    pred = np.reshape(pred, (-1, window.shape[-1]))
+                    # Add randomness per day
+                    pred = pred + np.random.normal(0, noise_std, size=pred.shape)
+                    path.extend(pred)
+                    # Update window
+                    window = np.vstack([window[len(pred):], pred])
+            
+            # Convert to actual prices
+            return self.model_loader.scaler.inverse_transform(np.array(path[:n_days]))
     
+    def simulate_batch(self, windows, n_days=30, noise_std=0.01, rng=None):
+        """Roll out one path per starting window in a single batched pass.
+
+        `windows` is a (B, lookback, n_features) array of scaled windows; the
+        result is a (B, n_days, n_features) array of actual prices. Pass a
+        `np.random.Generator` as `rng` for reproducible noise.
+        """
+        normal = rng.normal if rng is not None else np.random.normal
+        windows = np.array(windows, dtype=np.float32)
+        n_batch, _, n_features = windows.shape
+        path = np.empty((n_batch, n_days, n_features), dtype=np.float32)
+
+        session = self.predictor.session() if self.predictor is not None else nullcontext()
+        with span("simulation.total"), session:
+            day = 0
+            while day < n_days:
+                with span("simulation.step"):
+                    # One forward pass for every path; direct multi-step models emit k days
+                    pred = self._predict(windows)                 # (B, k, n_features)
+                    pred = (pred + normal(0, noise_std, size=pred.shape)).astype(np.float32)
+                    block = min(pred.shape[1], n_days - day)
+                    path[:, day:day + block, :] = pred[:, :block]
+                    # Slide every window forward by the k predicted days
+                    windows = np.concatenate([windows[:, pred.shape[1]:, :], pred], axis=1)
+                    day += block
+
+            return self._inverse_transform(path)
+
+    def simulate_scenarios(self, names, n_paths=1, n_days=60, noise_std=0.01):
+        """Roll out `n_paths` paths from each named anchor window in one batched pass.
+
+        Returns {name: (n_paths, n_days, n_features) prices}.
+        """
+        available = list(self.model_loader.scenario_names)
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise ValueError(f"Unknown scenarios {unknown}. Available scenarios: {available}")
+
+        idx = [available.index(name) for name in names]
+        windows = np.repeat(self.model_loader.scenario_windows[idx], n_paths, axis=0)
+        paths = self.simulate_batch(windows, n_days, noise_std)
+        paths = paths.reshape(len(names), n_paths, n_days, -1)
+        return dict(zip(names, paths))
+
+    def _predict(self, batch):
+        """Run the model on a (B, lookback, n_features) batch; returns (B, k, n_features)."""
+        if self.predictor is not None:
+            pred = self.predictor.predict(batch, max_wait_ms=self.max_wait_ms)
+        else:
+            pred = self.model_loader.model.predict(batch, batch_size=len(batch), verbose=0)
+        return np.asarray(pred, dtype=np.float32).reshape(len(batch), -1, batch.shape[-1])
+
+    def _inverse_transform(self, scaled):
+        """Inverse-scale an (..., n_features) array back to prices."""
+        flat = scaled.reshape(-1, scaled.shape[-1])
+        return np.asarray(self.model_loader.scaler.inverse_transform(flat)).reshape(scaled.shape)
+
     def run_simulations(self, n_simulations=1, n_days=60):
         """Run multiple simulations"""
-        return [self.simulate_path(n_days) for _ in range(n_simulations)]
\ No newline at end of file
+        windows = np.repeat(self.model_loader.initial_window[np.newaxis, :, :], n_simulations, axis=0)
+        return self.simulate_batch(windows, n_days)
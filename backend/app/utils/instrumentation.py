@@ -0,0 +1,161 @@
+# backend/app/utils/instrumentation.py
+"""Lightweight timing spans aggregated into Prometheus-style histograms.
+
+    with span("simulation.total"):
+        ...
+
+Spans are recorded into a process-wide registry rendered by `/metrics`. When
+a request collector is active (see `collect_request_spans`) they are also
+recorded per request so the timings can be returned as `Server-Timing`
+headers. Set `PORTFOLIO_METRICS=0` to turn every span into a shared no-op.
+"""
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+ENABLED = os.environ.get("PORTFOLIO_METRICS", "1") != "0"
+TIMING_HEADERS = os.environ.get("PORTFOLIO_TIMING_HEADERS", "0") == "1"
+
+# Upper bounds in seconds; +Inf is implicit
+DEFAULT_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+_request_spans = ContextVar("request_spans", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram of durations in seconds."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        idx = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[idx] += 1
+            self.total += seconds
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.total, self.count
+
+
+class MetricsRegistry:
+    """Histograms keyed by span name."""
+
+    metric_name = "portfolio_span_duration_seconds"
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        hist = self._histograms.get(name)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(name, Histogram(self.buckets))
+        hist.observe(seconds)
+
+    def get(self, name):
+        return self._histograms.get(name)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = [
+            f"# HELP {self.metric_name} Time spent in instrumented backend spans.",
+            f"# TYPE {self.metric_name} histogram",
+        ]
+        # Snapshot under the lock: spans may register new names while rendering
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+        for name, hist in histograms:
+            counts, total, count = hist.snapshot()
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{self.metric_name}_bucket{{span="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'{self.metric_name}_sum{{span="{name}"}} {total}')
+            lines.append(f'{self.metric_name}_count{{span="{name}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        registry.observe(self.name, elapsed)
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append((self.name, elapsed))
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name):
+    """Context manager timing the enclosed block under `name`."""
+    if not ENABLED:
+        return _NOOP
+    return _Span(name)
+
+
+@contextmanager
+def collect_request_spans():
+    """Collect spans recorded in this context into a list.
+
+    Only the current thread and contexts copied from it (e.g. asyncio tasks)
+    see the collector. Spans recorded on other threads, such as the shared
+    inference batcher's worker, go to the registry but not to this list.
+    """
+    spans = []
+    token = _request_spans.set(spans)
+    try:
+        yield spans
+    finally:
+        _request_spans.reset(token)
+
+
+def server_timing_header(spans):
+    """Sum spans per name into a `Server-Timing` header value (durations in ms)."""
+    totals = {}
+    for name, seconds in spans:
+        totals[name] = totals.get(name, 0.0) + seconds
+    return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in totals.items())
@@ -1,4 +1,7 @@
 # backend/app/utils/serialization.py
+import io
+import json
+
 import numpy as np
 
 try:
@@ -6,6 +9,20 @@ try:
 except Exception:  # pandas optional
     pd = None
 
+try:
+    import orjson
+except Exception:  # orjson optional; falls back to to_py + json
+    orjson = None
+
+try:
+    import pyarrow as pa
+except Exception:  # pyarrow optional; only needed for Arrow IPC exports
+    pa = None
+
+NPZ_MEDIA_TYPE = "application/x-npz"
+NPY_MEDIA_TYPE = "application/x-npy"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
 def to_py(obj):
     """Recursively convert numpy/pandas to plain Python types."""
     if isinstance(obj, (np.floating, np.float32, np.float64)):
@@ -23,3 +40,98 @@ def to_py(obj):
     if isinstance(obj, (list, tuple)):
         return [to_py(x) for x in obj]
     return obj
+
+def _orjson_default(obj):
+    # Non-contiguous arrays and pandas objects are not handled natively
+    if isinstance(obj, np.ndarray):
+        return np.ascontiguousarray(obj)
+    converted = to_py(obj)
+    if converted is obj:
+        raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+    return converted
+
+def to_json_bytes(obj):
+    """Encode a result dict to JSON, serializing numpy arrays directly when orjson is available."""
+    if orjson is not None:
+        return orjson.dumps(
+            obj, default=_orjson_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(to_py(obj)).encode("utf-8")
+
+def _flatten(obj, prefix=""):
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            yield from _flatten(v, f"{prefix}{k}/")
+    else:
+        yield prefix.rstrip("/"), np.asarray(obj)
+
+def to_npz_bytes(obj):
+    """Encode a (nested) result dict as an uncompressed .npz archive keyed by `a/b/c` paths."""
+    buf = io.BytesIO()
+    np.savez(buf, **dict(_flatten(obj)))
+    return buf.getvalue()
+
+def downsample(curve, resolution):
+    """Evenly sample `resolution` points from a curve, always keeping the first and last."""
+    curve = np.asarray(curve)
+    if resolution is None or resolution >= len(curve):
+        return curve
+    idx = np.unique(np.linspace(0, len(curve) - 1, resolution).round().astype(int))
+    return curve[idx]
+
+def iter_npy_chunks(paths, path_range, columns, chunk_paths=256):
+    """Stream `paths[start:stop][:, :, columns]` as one little-endian float32 .npy file.
+
+    `paths` may be a memmap; only `chunk_paths` paths are materialized at a time.
+    """
+    start, stop = path_range
+    columns = np.asarray(columns)
+    header = io.BytesIO()
+    np.lib.format.write_array_header_1_0(header, {
+        "descr": "<f4",
+        "fortran_order": False,
+        "shape": (stop - start, paths.shape[1], len(columns)),
+    })
+    yield header.getvalue()
+    for lo in range(start, stop, chunk_paths):
+        chunk = paths[lo:min(lo + chunk_paths, stop)][:, :, columns]
+        yield np.ascontiguousarray(chunk, dtype="<f4").tobytes()
+
+def iter_arrow_chunks(paths, path_range, columns, names, metadata, chunk_paths=256):
+    """Stream the same selection as Arrow IPC: one row per (path, day), one float32 column per name."""
+    # Checked eagerly so callers can fail before a response starts streaming
+    if pa is None:
+        raise RuntimeError("pyarrow is required for Arrow exports.")
+    return _arrow_chunks(paths, path_range, columns, names, metadata, chunk_paths)
+
+def _arrow_chunks(paths, path_range, columns, names, metadata, chunk_paths):
+    start, stop = path_range
+    columns = np.asarray(columns)
+    horizon = paths.shape[1]
+    schema = pa.schema(
+        [pa.field("path", pa.int32()), pa.field("day", pa.int32())]
+        + [pa.field(name, pa.float32()) for name in names],
+        metadata={k: str(v) for k, v in metadata.items()},
+    )
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, schema)
+
+    def drain():
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    yield drain()
+    for lo in range(start, stop, chunk_paths):
+        hi = min(lo + chunk_paths, stop)
+        chunk = np.asarray(paths[lo:hi][:, :, columns], dtype=np.float32).reshape(-1, len(columns))
+        arrays = [
+            pa.array(np.repeat(np.arange(lo, hi, dtype=np.int32), horizon)),
+            pa.array(np.tile(np.arange(horizon, dtype=np.int32), hi - lo)),
+        ] + [pa.array(chunk[:, j]) for j in range(len(columns))]
+        writer.write_batch(pa.record_batch(arrays, schema=schema))
+        yield drain()
+    writer.close()
+    yield drain()
@@ -0,0 +1,255 @@
+# benchmarks/run_benchmarks.py
+"""Throughput/latency benchmarks for the simulation and optimization hot paths.
+
+Runs against the deterministic stand-ins in `standin.py`, so no trained
+artifacts are needed. Results are written as JSON for diffing between
+versions:
+
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --quick
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, os.path.join(project_root, "backend"))
+sys.path.insert(0, current_dir)
+
+from app.services.batching import InferenceBatcher
+from app.services.optimizer import PortfolioOptimizer
+from app.services.simulation import MonteCarloSimulator
+from app.utils.serialization import to_json_bytes, to_npz_bytes, to_py
+from standin import StandInModelLoader
+
+FULL_GRID = {
+    "paths": [6, 64, 256],
+    "horizons": [30, 75],
+    "tickers": [3, 10, 30],
+    "repeat": 5,
+}
+QUICK_GRID = {
+    "paths": [6, 32],
+    "horizons": [10, 30],
+    "tickers": [3, 10],
+    "repeat": 2,
+}
+
+
+def time_call(fn, repeat):
+    """Run `fn` once to warm up, then `repeat` timed runs; returns seconds per run."""
+    fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def record(name, params, timings, work=None):
+    """Summarize timings; `work` is the number of units processed per call."""
+    result = {
+        "name": name,
+        "params": params,
+        "runs": len(timings),
+        "min_s": min(timings),
+        "median_s": statistics.median(timings),
+        "mean_s": statistics.fmean(timings),
+    }
+    if work is not None:
+        result["throughput_per_s"] = work / result["median_s"]
+    return result
+
+
+def bench_simulation(grid, loader):
+    sim = MonteCarloSimulator(loader)
+    results = []
+    for horizon in grid["horizons"]:
+        np.random.seed(0)
+        timings = time_call(lambda: sim.simulate_path(horizon), grid["repeat"])
+        results.append(record("simulate_path", {"horizon": horizon}, timings, work=horizon))
+        for n_paths in grid["paths"]:
+            np.random.seed(0)
+            timings = time_call(lambda: sim.run_simulations(n_paths, horizon), grid["repeat"])
+            results.append(record(
+                "run_simulations", {"paths": n_paths, "horizon": horizon},
+                timings, work=n_paths * horizon,
+            ))
+            names = loader.scenario_names
+            timings = time_call(lambda: sim.simulate_scenarios(names, n_paths, horizon), grid["repeat"])
+            results.append(record(
+                "simulate_scenarios",
+                {"scenarios": len(names), "paths": n_paths, "horizon": horizon},
+                timings, work=len(names) * n_paths * horizon,
+            ))
+    return results
+
+
+def bench_concurrency(grid, loader, n_clients=8):
+    """Concurrent rollouts, each driving its own batches vs. sharing a batcher."""
+    shared = InferenceBatcher(loader.model)
+    results = []
+    try:
+        for horizon in grid["horizons"]:
+            for n_paths in grid["paths"]:
+                for label, batcher in (("isolated", None), ("micro_batched", shared)):
+                    def call():
+                        threads = [
+                            threading.Thread(
+                                target=MonteCarloSimulator(loader, predictor=batcher).run_simulations,
+                                args=(n_paths, horizon),
+                            )
+                            for _ in range(n_clients)
+                        ]
+                        for t in threads:
+                            t.start()
+                        for t in threads:
+                            t.join()
+
+                    timings = time_call(call, grid["repeat"])
+                    results.append(record(
+                        "concurrent_simulations",
+                        {"mode": label, "clients": n_clients, "paths": n_paths, "horizon": horizon},
+                        timings, work=n_clients * n_paths * horizon,
+                    ))
+    finally:
+        shared.close()  # don't leave its worker thread running into later sections
+    return results
+
+
+def bench_optimizer(grid, loader):
+    sim = MonteCarloSimulator(loader)
+    opt = PortfolioOptimizer(loader, sim)
+    results = []
+    for horizon in grid["horizons"]:
+        for n_paths in grid["paths"]:
+            np.random.seed(0)
+            paths = sim.run_simulations(n_paths, horizon)
+            for n_tickers in grid["tickers"]:
+                indices = list(range(n_tickers))
+                params = {"paths": n_paths, "horizon": horizon, "tickers": n_tickers}
+                weights = np.ones(n_tickers) / n_tickers
+
+                timings = time_call(lambda: opt.optimize_weights(paths, indices), grid["repeat"])
+                results.append(record("optimize_weights", params, timings, work=n_paths))
+
+                # Fresh optimizer per call so the (subset) moment index build is timed, not cached
+                timings = time_call(
+                    lambda: PortfolioOptimizer(loader, sim).indexed_weights(paths, indices), grid["repeat"]
+                )
+                results.append(record("indexed_weights", params, timings, work=n_paths))
+
+                # Subset queries against a full-universe index kept for the path set
+                opt.moment_index(paths)
+                timings = time_call(lambda: opt.indexed_weights(paths, indices), grid["repeat"])
+                results.append(record("indexed_weights_cached", params, timings, work=n_paths))
+
+                timings = time_call(
+                    lambda: opt.compute_growth(paths, indices, weights, 10000), grid["repeat"]
+                )
+                results.append(record("compute_growth", params, timings, work=n_paths * horizon))
+    return results
+
+
+def bench_serialization(grid):
+    results = []
+    for horizon in grid["horizons"]:
+        for n_paths in grid["paths"]:
+            payload = {
+                "allocations": {f"T{i}": np.float64(1 / 30) for i in range(30)},
+                "expected_return": np.float64(0.01),
+                "growth_data": {
+                    "optimized": np.linspace(0, 1, horizon),
+                    "paths": np.random.default_rng(0).random((n_paths, horizon)),
+                },
+            }
+            for name, encode in (("to_py", to_py), ("to_json_bytes", to_json_bytes),
+                                 ("to_npz_bytes", to_npz_bytes)):
+                timings = time_call(lambda: encode(payload), grid["repeat"])
+                results.append(record(
+                    name, {"paths": n_paths, "horizon": horizon},
+                    timings, work=n_paths * horizon,
+                ))
+    return results
+
+
+def bench_endpoint(grid, loader):
+    try:
+        from fastapi.testclient import TestClient
+        from app.dependencies import get_inference_batcher, get_model_loader
+        from app.main import app
+    except Exception as e:  # backend deps (fastapi, httpx) not installed
+        return [{"name": "optimize_endpoint", "skipped": f"{type(e).__name__}: {e}"}]
+
+    # Same settings as the app's batcher, but owned here so it can be closed afterwards
+    batcher = get_inference_batcher.__wrapped__(loader)
+    app.dependency_overrides[get_model_loader] = lambda: loader
+    app.dependency_overrides[get_inference_batcher] = lambda: batcher
+    client = TestClient(app)
+    results = []
+    try:
+        for n_tickers in grid["tickers"]:
+            body = {"selected_stocks": loader.all_tickers[:n_tickers], "total_capital": 10000}
+
+            def call():
+                response = client.post("/api/portfolio/optimize", json=body)
+                response.raise_for_status()
+
+            np.random.seed(0)
+            timings = time_call(call, grid["repeat"])
+            results.append(record("optimize_endpoint", {"tickers": n_tickers}, timings, work=1))
+    finally:
+        app.dependency_overrides.pop(get_model_loader, None)
+        app.dependency_overrides.pop(get_inference_batcher, None)
+        if batcher is not None:
+            batcher.close()
+    return results
+
+
+def run(grid):
+    loader = StandInModelLoader()
+    results = []
+    results += bench_simulation(grid, loader)
+    results += bench_concurrency(grid, loader)
+    results += bench_optimizer(grid, loader)
+    results += bench_serialization(grid)
+    results += bench_endpoint(grid, loader)
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "grid": grid,
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write JSON results here (default: stdout)")
+    parser.add_argument("--quick", action="store_true", help="small grid for smoke runs")
+    args = parser.parse_args(argv)
+
+    report = run(QUICK_GRID if args.quick else FULL_GRID)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
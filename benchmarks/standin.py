@@ -0,0 +1,98 @@
+# benchmarks/standin.py
+"""Deterministic stand-ins for the trained artifacts.
+
+The benchmarks must run without `artifacts/model.h5`, so this module builds a
+small NumPy LSTM with fixed seeded weights and a loader exposing the same
+attributes the services read from `ModelLoader`.
+"""
+import numpy as np
+
+DOW30_TICKERS = [
+    "AAPL", "AMGN", "AMZN", "AXP", "BA", "CAT", "CRM", "CSCO", "CVX", "DIS",
+    "GS", "HD", "HON", "IBM", "JNJ", "JPM", "KO", "MCD", "MMM", "MRK",
+    "MSFT", "NKE", "NVDA", "PG", "SHW", "TRV", "UNH", "V", "VZ", "WMT",
+]
+
+
+class StandInLSTM:
+    """Single-layer LSTM + linear head with seeded weights.
+
+    Mirrors the Keras `predict(x, batch_size=None, verbose=0)` signature and
+    maps a (B, lookback, n_features) batch to (B, n_features).
+    """
+
+    def __init__(self, n_features, units=16, seed=0):
+        rng = np.random.default_rng(seed)
+        scale = 1.0 / np.sqrt(units)
+        self.units = units
+        self.W = rng.normal(0, scale, size=(n_features, 4 * units)).astype(np.float32)
+        self.U = rng.normal(0, scale, size=(units, 4 * units)).astype(np.float32)
+        self.b = np.zeros(4 * units, dtype=np.float32)
+        self.head = rng.normal(0, 0.01, size=(units, n_features)).astype(np.float32)
+
+    def predict(self, x, batch_size=None, verbose=0):
+        x = np.asarray(x, dtype=np.float32)
+        h = np.zeros((x.shape[0], self.units), dtype=np.float32)
+        c = np.zeros_like(h)
+        for t in range(x.shape[1]):
+            z = x[:, t, :] @ self.W + h @ self.U + self.b
+            i, f, g, o = np.split(z, 4, axis=1)
+            c = _sigmoid(f) * c + _sigmoid(i) * np.tanh(g)
+            h = _sigmoid(o) * np.tanh(c)
+        # Small learned-looking move around the last observed day
+        return x[:, -1, :] + h @ self.head
+
+
+class StandInScaler:
+    """Affine scaler with the RobustScaler transform/inverse_transform API."""
+
+    def __init__(self, center, scale):
+        self.center_ = np.asarray(center, dtype=np.float64)
+        self.scale_ = np.asarray(scale, dtype=np.float64)
+
+    def transform(self, x):
+        return (np.asarray(x) - self.center_) / self.scale_
+
+    def inverse_transform(self, x):
+        return np.asarray(x) * self.scale_ + self.center_
+
+
+class StandInModelLoader:
+    """Drop-in for `ModelLoader` backed by deterministic stand-ins."""
+
+    def __init__(self, n_tickers=len(DOW30_TICKERS), lookback=60, units=16, seed=0):
+        rng = np.random.default_rng(seed)
+        self.all_tickers = _tickers(n_tickers)
+        self.close_cols = [f"{ticker}_close" for ticker in self.all_tickers]
+        self.model = StandInLSTM(n_tickers, units=units, seed=seed)
+        self.scaler = StandInScaler(
+            center=rng.uniform(50, 400, size=n_tickers),
+            scale=rng.uniform(5, 40, size=n_tickers),
+        )
+        steps = rng.normal(0, 0.05, size=(lookback, n_tickers))
+        self.initial_window = np.cumsum(steps, axis=0).astype(np.float32)
+        # Anchors shifted up/down from the latest window, like recent days / stress periods
+        self.scenario_names = ["latest", "rally", "selloff", "high_volatility"]
+        self.scenario_windows = np.stack([
+            self.initial_window,
+            self.initial_window + np.linspace(0, 0.5, lookback)[:, None],
+            self.initial_window - np.linspace(0, 0.5, lookback)[:, None],
+            self.initial_window * 1.5,
+        ]).astype(np.float32)
+
+    def get_stock_indices(self, selected_tickers):
+        indices = [self.close_cols.index(f"{t}_close") for t in selected_tickers
+                   if f"{t}_close" in self.close_cols]
+        if not indices:
+            raise ValueError(f"None of the selected stocks {selected_tickers} are available.")
+        return indices
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _tickers(n):
+    if n <= len(DOW30_TICKERS):
+        return DOW30_TICKERS[:n]
+    return DOW30_TICKERS + [f"T{i:03d}" for i in range(n - len(DOW30_TICKERS))]
@@ -1,8 +1,14 @@
 # tests/conftest.py
+import sys
+import os
 import pytest
 import numpy as np
 from unittest.mock import MagicMock
 
+# Services import shared helpers as `app.utils.*`
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(current_dir, "..", "backend")))
+
 @pytest.fixture
 def mock_model_loader():
     class MockModelLoader:
@@ -0,0 +1,87 @@
+# tests/test_backtest.py
+import sys
+import os
+import pytest
+import numpy as np
+
+# Add necessary paths to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, os.path.join(project_root, "backend/app/services"))
+
+from backtest import WalkForwardBacktester, out_of_sample_start
+from optimizer import PortfolioOptimizer
+from simulation import MonteCarloSimulator
+
+class DriftModel:
+    """Predicts the last scaled price plus a constant daily drift."""
+    def predict(self, x, **kwargs):
+        return x[:, -1, :] * 1.01
+
+class IdentityScaler:
+    def transform(self, x):
+        return np.asarray(x)
+
+    def inverse_transform(self, x):
+        return np.asarray(x)
+
+class Loader:
+    def __init__(self):
+        self.model = DriftModel()
+        self.scaler = IdentityScaler()
+        self.initial_window = np.ones((5, 2))
+
+@pytest.fixture
+def backtester():
+    loader = Loader()
+    sim = MonteCarloSimulator(loader)
+    opt = PortfolioOptimizer(loader, sim)
+    return WalkForwardBacktester(loader, sim, opt, horizon=4, step=3, n_paths=2,
+                                 noise_std=0.0, anchors_per_batch=2)
+
+def test_anchor_windows_align_with_history(backtester):
+    """Each window holds the lookback days immediately before its anchor"""
+    closes = np.arange(40, dtype=float).reshape(20, 2) + 1
+    anchors = backtester.anchor_indices(len(closes))
+    windows = backtester.anchor_windows(closes, anchors)
+
+    assert anchors[0] == 5 and anchors[-1] <= 16
+    assert windows.shape == (len(anchors), 5, 2)
+    np.testing.assert_array_equal(windows[1], closes[anchors[1] - 5:anchors[1]])
+
+def test_walk_forward_scores_every_anchor(backtester):
+    """Rising history with a rising model is always a hit"""
+    closes = 100 * 1.01 ** np.arange(20)[:, None] * np.array([1.0, 2.0])
+    result = backtester.run(closes, [0, 1])
+
+    n_anchors = len(result["anchors"])
+    assert result["weights"].shape == (n_anchors, 2)
+    assert result["weights"].sum(axis=1) == pytest.approx(np.ones(n_anchors), abs=0.01)
+    assert result["summary"]["n_anchors"] == n_anchors
+    assert result["summary"]["hit_rate"] == 1.0
+    assert result["summary"]["mean_realized_return"] == pytest.approx(1.01 ** 4 - 1)
+
+def test_expected_matches_realized_for_perfect_model(backtester):
+    """A noiseless, correctly specified model forecasts the realized return exactly"""
+    closes = 100 * 1.01 ** np.arange(20)[:, None] * np.array([1.0, 2.0])
+    result = backtester.run(closes, [0, 1])
+
+    # Rollouts run in float32
+    np.testing.assert_allclose(result["expected_return"], result["realized_return"], rtol=1e-5)
+    assert result["summary"]["mean_expected_return"] == pytest.approx(1.01 ** 4 - 1, rel=1e-5)
+
+def test_walk_forward_starts_at_test_split(backtester):
+    """Anchors before `start` (the training period) are skipped"""
+    closes = 100 * 1.01 ** np.arange(40)[:, None] * np.array([1.0, 2.0])
+    start = out_of_sample_start(len(closes), backtester.lookback)
+    result = backtester.run(closes, [0, 1], start=start)
+
+    assert start == 5 + int(0.8 * 35)
+    assert result["anchors"][0] == start
+    assert result["summary"]["first_anchor"] == start
+    with pytest.raises(ValueError, match="41 days"):
+        backtester.run(closes, [0, 1], start=37)
+
+def test_walk_forward_requires_enough_history(backtester):
+    with pytest.raises(ValueError):
+        backtester.run(np.ones((6, 2)), [0, 1])
@@ -0,0 +1,93 @@
+# tests/test_batching.py
+import sys
+import os
+import threading
+import time
+import pytest
+import numpy as np
+
+# Add necessary paths to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, os.path.join(project_root, "backend/app/services"))
+
+from batching import InferenceBatcher
+from simulation import MonteCarloSimulator
+
+class CountingModel:
+    """Predicts the last row plus one, recording every forward-pass size."""
+    def __init__(self):
+        self.batch_sizes = []
+        self._lock = threading.Lock()
+
+    def predict(self, x, **kwargs):
+        with self._lock:
+            self.batch_sizes.append(len(x))
+        return x[:, -1, :] + 1.0
+
+def run_concurrently(fns):
+    results = [None] * len(fns)
+    def target(i):
+        results[i] = fns[i]()
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(len(fns))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+def test_concurrent_rollouts_share_forward_passes(mock_model_loader):
+    """Four concurrent simulations need far fewer forward passes than 4 x n_days"""
+    model = CountingModel()
+    batcher = InferenceBatcher(model, max_wait_ms=50)
+    windows = np.stack([mock_model_loader.initial_window] * 3)
+
+    def rollout(offset):
+        sim = MonteCarloSimulator(mock_model_loader, predictor=batcher)
+        return lambda: sim.simulate_batch(windows + offset, n_days=5, noise_std=0.0)
+
+    results = run_concurrently([rollout(i) for i in range(4)])
+
+    assert len(model.batch_sizes) < 4 * 5
+    assert sum(model.batch_sizes) == 4 * 5 * 3
+    for i, paths in enumerate(results):
+        # Each caller gets back its own rows: last row + day, scaled by 100
+        expected = (mock_model_loader.initial_window[-1] + i + np.arange(1, 6)[:, None]) * 100
+        np.testing.assert_allclose(paths[0], expected, rtol=1e-5)
+
+def test_size_cap_splits_batches():
+    model = CountingModel()
+    batcher = InferenceBatcher(model, max_batch_size=4, max_wait_ms=20)
+    inputs = [np.full((2, 3, 2), i, dtype=np.float32) for i in range(4)]
+
+    outputs = run_concurrently([lambda x=x: batcher.predict(x) for x in inputs])
+
+    assert max(model.batch_sizes) <= 4
+    for x, out in zip(inputs, outputs):
+        np.testing.assert_array_equal(out, x[:, -1, :] + 1.0)
+
+def test_callers_cannot_raise_the_wait_cap():
+    batcher = InferenceBatcher(CountingModel(), max_wait_ms=0)
+    start = time.monotonic()
+    batcher.predict(np.zeros((1, 2, 2)), max_wait_ms=10_000)
+
+    assert time.monotonic() - start < 5
+
+def test_close_stops_worker_and_batcher_stays_usable():
+    batcher = InferenceBatcher(CountingModel(), max_wait_ms=0)
+    batcher.predict(np.zeros((1, 2, 2)))
+    worker = batcher._worker
+    batcher.close()
+
+    assert not worker.is_alive()
+    np.testing.assert_array_equal(batcher.predict(np.zeros((1, 2, 2))), np.ones((1, 2)))
+    batcher.close()
+
+def test_model_errors_reach_every_caller():
+    class Broken:
+        def predict(self, x, **kwargs):
+            raise RuntimeError("boom")
+
+    batcher = InferenceBatcher(Broken(), max_wait_ms=0)
+    with pytest.raises(RuntimeError, match="boom"):
+        batcher.predict(np.zeros((1, 2, 2)))
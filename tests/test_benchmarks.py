@@ -0,0 +1,40 @@
+# tests/test_benchmarks.py
+import sys
+import os
+import json
+import threading
+import numpy as np
+
+# Add necessary paths to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, os.path.join(project_root, "benchmarks"))
+
+from standin import StandInModelLoader
+import run_benchmarks
+
+def test_standin_model_is_deterministic():
+    """Two loaders with the same seed predict identically"""
+    a, b = StandInModelLoader(n_tickers=4), StandInModelLoader(n_tickers=4)
+    batch = np.stack([a.initial_window] * 2)
+
+    pred = a.model.predict(batch)
+    assert pred.shape == (2, 4)
+    np.testing.assert_array_equal(pred, b.model.predict(batch))
+    np.testing.assert_allclose(a.scaler.inverse_transform(a.scaler.transform(pred)), pred, rtol=1e-6)
+
+def test_benchmark_report_is_json(tmp_path):
+    """A tiny grid produces a machine-readable report"""
+    grid = {"paths": [2], "horizons": [3], "tickers": [2], "repeat": 1}
+    batchers = lambda: [t for t in threading.enumerate() if t.name == "inference-batcher"]
+    before = len(batchers())
+    report = run_benchmarks.run(grid)
+
+    names = {r["name"] for r in report["results"]}
+    assert {"simulate_path", "run_simulations", "optimize_weights", "compute_growth", "to_py"} <= names
+    assert report["meta"]["grid"] == grid
+    # The endpoint case runs against the stand-in, not just records a skip
+    assert all("skipped" not in r for r in report["results"] if r["name"] == "optimize_endpoint")
+    json.dumps(report)
+    # Batcher worker threads are stopped, not leaked into later sections
+    assert len(batchers()) == before
@@ -0,0 +1,41 @@
+# tests/test_instrumentation.py
+import pytest
+
+from app.utils import instrumentation
+from app.utils.instrumentation import MetricsRegistry, collect_request_spans, server_timing_header, span
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    instrumentation.registry.reset()
+    yield
+    instrumentation.registry.reset()
+
+def test_histogram_renders_prometheus_text():
+    registry = MetricsRegistry(buckets=(0.01, 0.1))
+    registry.observe("simulation.total", 0.005)
+    registry.observe("simulation.total", 0.05)
+    registry.observe("simulation.total", 5.0)
+
+    text = registry.render()
+    assert '# TYPE portfolio_span_duration_seconds histogram' in text
+    assert 'portfolio_span_duration_seconds_bucket{span="simulation.total",le="0.01"} 1' in text
+    assert 'portfolio_span_duration_seconds_bucket{span="simulation.total",le="0.1"} 2' in text
+    assert 'portfolio_span_duration_seconds_bucket{span="simulation.total",le="+Inf"} 3' in text
+    assert 'portfolio_span_duration_seconds_count{span="simulation.total"} 3' in text
+
+def test_spans_feed_registry_and_request_collector():
+    with collect_request_spans() as spans:
+        with span("optimization.solve"):
+            pass
+        with span("optimization.solve"):
+            pass
+
+    assert [name for name, _ in spans] == ["optimization.solve", "optimization.solve"]
+    assert instrumentation.registry.get("optimization.solve").count == 2
+    assert server_timing_header(spans).startswith("optimization.solve;dur=")
+
+def test_disabled_spans_are_noops(monkeypatch):
+    monkeypatch.setattr(instrumentation, "ENABLED", False)
+    with span("serialization"):
+        pass
+    assert instrumentation.registry.get("serialization") is None
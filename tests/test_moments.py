@@ -0,0 +1,85 @@
+# tests/test_moments.py
+import sys
+import os
+import pytest
+import numpy as np
+from scipy.optimize import check_grad
+
+# Add necessary paths to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, os.path.join(project_root, "backend/app/services"))
+
+from moments import ReturnMomentIndex
+from optimizer import PortfolioOptimizer
+
+@pytest.fixture
+def paths():
+    rng = np.random.default_rng(0)
+    drift = np.array([0.002, 0.0005, 0.001, -0.001])
+    rets = drift + rng.normal(0, [0.01, 0.02, 0.015, 0.01], size=(8, 40, 4))
+    return 100 * np.cumprod(1 + rets, axis=1)
+
+def test_index_matches_direct_moments(paths):
+    """Subset lookups equal moments recomputed from the sliced prices"""
+    index = ReturnMomentIndex.from_paths(paths)
+    means, covs = index.subset([2, 0])
+
+    rets = np.diff(paths[3][:, [2, 0]], axis=0) / paths[3][:-1, [2, 0]]
+    np.testing.assert_allclose(means[3], rets.mean(axis=0))
+    np.testing.assert_allclose(covs[3], np.cov(rets, rowvar=False, bias=True))
+
+def test_path_sharpe_matches_constant_mix_returns(paths):
+    index = ReturnMomentIndex.from_paths(paths)
+    weights = np.array([0.2, 0.5, 0.3])
+    port_rets = index.returns[:, :, [0, 1, 3]] @ weights
+    expected = port_rets.mean(axis=1) / (port_rets.std(axis=1) + 1e-8)
+    np.testing.assert_allclose(index.path_sharpe(weights, [0, 1, 3]), expected)
+
+def test_mean_sharpe_gradient(paths, mock_model_loader, mock_simulator):
+    """The gradient handed to minimize matches finite differences of its value"""
+    optimizer = PortfolioOptimizer(mock_model_loader, mock_simulator)
+    means, covs = optimizer.moment_index(paths).subset([0, 1, 2])
+    objective = optimizer._mean_sharpe_objective(means, covs)
+
+    w = np.array([0.3, 0.3, 0.4])
+    assert objective(w)[0] == pytest.approx(-np.mean(optimizer.moment_index(paths).path_sharpe(w, [0, 1, 2])))
+    assert check_grad(lambda x: objective(x)[0], lambda x: objective(x)[1], w) < 1e-5
+
+def test_default_objective_is_exact_sharpe(paths, mock_model_loader, mock_simulator):
+    """The default solve maximizes the same buy-and-hold Sharpe that optimize reports"""
+    optimizer = PortfolioOptimizer(mock_model_loader, mock_simulator)
+    np.testing.assert_allclose(optimizer.solve_weights(paths, [0, 1, 3]),
+                               optimizer.optimize_weights(paths, [0, 1, 3]))
+    with pytest.raises(ValueError):
+        optimizer.solve_weights(paths, [0, 1], "unknown")
+
+@pytest.mark.parametrize("objective", ["mean_sharpe_cm", "max_sharpe"])
+def test_indexed_weights_are_valid(paths, mock_model_loader, mock_simulator, objective):
+    optimizer = PortfolioOptimizer(mock_model_loader, mock_simulator)
+    weights = optimizer.indexed_weights(paths, [0, 1, 3], objective)
+
+    assert weights.sum() == pytest.approx(1.0, abs=1e-6)
+    assert np.all(weights >= -1e-9)
+    # Highest-drift, lowest-vol asset dominates; the losing asset is dropped
+    assert weights[0] == weights.max()
+    assert weights[2] == pytest.approx(0.0, abs=1e-3)
+
+def test_index_built_once_per_path_set(paths, mock_model_loader, mock_simulator):
+    optimizer = PortfolioOptimizer(mock_model_loader, mock_simulator)
+    assert optimizer.moment_index(paths) is optimizer.moment_index(paths)
+    # A full-universe index serves any subset of the same path set
+    assert optimizer.moment_index(paths, [1, 3]) is optimizer.moment_index(paths)
+    assert optimizer.moment_index(paths) is not optimizer.moment_index(paths.copy())
+
+def test_subset_index_matches_full_index(paths, mock_model_loader, mock_simulator):
+    """One-off solves build moments for the requested assets only"""
+    optimizer = PortfolioOptimizer(mock_model_loader, mock_simulator)
+    index = optimizer.moment_index(paths, [3, 1])
+    full = ReturnMomentIndex.from_paths(paths)
+
+    assert index.means.shape == (8, 2) and index.covs.shape == (8, 2, 2)
+    assert index.covers([1]) and not index.covers([0, 1]) and not index.covers()
+    for got, expected in zip(index.subset([1, 3]), full.subset([1, 3])):
+        np.testing.assert_allclose(got, expected)
+    assert optimizer.moment_index(paths, [0, 1]) is not index
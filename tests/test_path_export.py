@@ -0,0 +1,115 @@
+# tests/test_path_export.py
+import sys
+import os
+import io
+import threading
+import pytest
+import numpy as np
+
+# Add necessary paths to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+sys.path.insert(0, os.path.join(project_root, "backend/app/services"))
+
+from path_store import PathStore
+from simulation import MonteCarloSimulator
+from app.utils.serialization import iter_arrow_chunks, iter_npy_chunks
+
+@pytest.fixture
+def simulator(mock_model_loader):
+    mock_model_loader.model.predict.side_effect = lambda x, **kwargs: x[:, -1, :] * 1.01
+    mock_model_loader.scenario_names = ["latest"]
+    mock_model_loader.scenario_windows = mock_model_loader.initial_window[np.newaxis]
+    return MonteCarloSimulator(mock_model_loader)
+
+def test_path_store_caches_seeded_sets(tmp_path, simulator):
+    """Path sets are built in chunks, reproducible per seed and reused from disk"""
+    store = PathStore(str(tmp_path), chunk_paths=3)
+    paths = store.get_or_create(simulator, n_paths=7, horizon=4, seed=1)
+
+    assert isinstance(paths, np.memmap)
+    assert paths.shape == (7, 4, 2) and paths.dtype == np.float32
+    calls = simulator.model_loader.model.predict.call_count
+    np.testing.assert_array_equal(store.get_or_create(simulator, n_paths=7, horizon=4, seed=1), paths)
+    assert simulator.model_loader.model.predict.call_count == calls
+
+    fresh = PathStore(str(tmp_path / "other"), chunk_paths=3).get_or_create(simulator, n_paths=7, horizon=4, seed=1)
+    np.testing.assert_array_equal(fresh, paths)
+    assert not np.array_equal(store.get_or_create(simulator, n_paths=7, horizon=4, seed=2), paths)
+
+    with pytest.raises(ValueError):
+        store.get_or_create(simulator, scenario="missing", n_paths=1, horizon=1)
+
+def test_path_store_refuses_oversized_and_unknown_sets(tmp_path, simulator):
+    """Size limits and scenario names are checked before anything touches disk"""
+    store = PathStore(str(tmp_path), max_set_bytes=1000)
+    (tmp_path / "missing_p1_h1_s0.npy").write_bytes(b"not an array")
+
+    with pytest.raises(ValueError, match="byte limit"):
+        store.get_or_create(simulator, n_paths=1000, horizon=10)
+    with pytest.raises(ValueError, match="Unknown scenario"):
+        store.get_or_create(simulator, scenario="missing", n_paths=1, horizon=1)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["missing_p1_h1_s0.npy"]
+
+def test_path_store_evicts_least_recently_used(tmp_path, simulator):
+    one_file = 128 + 5 * 4 * 2 * 4  # .npy header + float32 data
+    store = PathStore(str(tmp_path), max_cache_bytes=3 * one_file)
+    for seed in range(3):
+        store.get_or_create(simulator, n_paths=5, horizon=4, seed=seed)
+        os.utime(store.path_for("latest", 5, 4, seed), (seed, seed))
+    # Seed 0 was used longest ago, so it is evicted when seed 3 is built
+    store.get_or_create(simulator, n_paths=5, horizon=4, seed=3)
+
+    assert not os.path.exists(store.path_for("latest", 5, 4, 0))
+    assert os.path.exists(store.path_for("latest", 5, 4, 1))
+    assert os.path.exists(store.path_for("latest", 5, 4, 3))
+
+def test_path_store_survives_concurrent_eviction(tmp_path, simulator):
+    """Requests racing with eviction rebuild the set instead of failing"""
+    one_file = 128 + 5 * 4 * 2 * 4
+    store = PathStore(str(tmp_path), max_cache_bytes=one_file)
+    errors = []
+
+    def export(seed):
+        try:
+            for _ in range(10):
+                assert store.get_or_create(simulator, n_paths=5, horizon=4, seed=seed).shape == (5, 4, 2)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=export, args=(seed % 7,)) for seed in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert len(list(tmp_path.glob("*.npy"))) == 1
+
+def test_path_store_removes_stale_temp_files(tmp_path, simulator):
+    store = PathStore(str(tmp_path), stale_tmp_seconds=60)
+    stale, fresh = tmp_path / "latest_p1_h1_s0.npy.dead.tmp", tmp_path / "latest_p1_h1_s0.npy.live.tmp"
+    stale.write_bytes(b"x")
+    fresh.write_bytes(b"x")
+    os.utime(stale, (0, 0))
+    store.get_or_create(simulator, n_paths=5, horizon=4)
+
+    assert not stale.exists()
+    assert fresh.exists()
+
+def test_npy_stream_selects_paths_and_tickers():
+    paths = np.arange(5 * 3 * 4, dtype=np.float32).reshape(5, 3, 4)
+    data = b"".join(iter_npy_chunks(paths, (1, 4), [3, 0], chunk_paths=2))
+
+    np.testing.assert_array_equal(np.load(io.BytesIO(data)), paths[1:4][:, :, [3, 0]])
+
+def test_arrow_stream_carries_schema_metadata():
+    pa = pytest.importorskip("pyarrow")
+    paths = np.arange(4 * 2 * 3, dtype=np.float32).reshape(4, 2, 3)
+    chunks = iter_arrow_chunks(paths, (1, 4), [2], ["MSFT"], {"horizon": 2, "seed": 7}, chunk_paths=2)
+
+    table = pa.ipc.open_stream(b"".join(chunks)).read_all()
+    assert table.schema.metadata[b"seed"] == b"7"
+    assert table.column("path").to_pylist() == [1, 1, 2, 2, 3, 3]
+    assert table.column("day").to_pylist() == [0, 1] * 3
+    np.testing.assert_array_equal(table.column("MSFT").to_numpy(), paths[1:4, :, 2].ravel())
@@ -0,0 +1,34 @@
+# tests/test_serialization.py
+import io
+import json
+import numpy as np
+
+from app.utils.serialization import downsample, to_json_bytes, to_npz_bytes, to_py
+
+RESULT = {
+    "allocations": {"AAPL": np.float64(0.25), "MSFT": 0.75},
+    "sharpe": np.float32(0.5),
+    "frontier": [],
+    "growth_data": {"optimized": np.linspace(0.0, 10.0, 11)},
+}
+
+def test_json_bytes_match_to_py():
+    """Direct numpy encoding gives the same document as the recursive path"""
+    assert json.loads(to_json_bytes(RESULT)) == json.loads(json.dumps(to_py(RESULT)))
+
+def test_json_bytes_handle_non_contiguous_arrays():
+    data = {"curve": np.arange(12.0).reshape(3, 4)[:, 0]}
+    assert json.loads(to_json_bytes(data)) == {"curve": [0.0, 4.0, 8.0]}
+
+def test_npz_bytes_flatten_nested_keys():
+    archive = np.load(io.BytesIO(to_npz_bytes(RESULT)))
+    np.testing.assert_array_equal(archive["growth_data/optimized"], RESULT["growth_data"]["optimized"])
+    assert float(archive["allocations/AAPL"]) == 0.25
+
+def test_downsample_keeps_endpoints():
+    curve = np.arange(75.0)
+    sampled = downsample(curve, 10)
+    assert len(sampled) == 10
+    assert sampled[0] == 0.0 and sampled[-1] == 74.0
+    assert downsample(curve, None) is curve
+    assert len(downsample(curve, 200)) == 75
@@ -41,4 +41,88 @@ def test_portfolio_optimizer(mock_model_loader, mock_simulator):
     
     assert len(report["growth_data"]["optimized"]) == 3
     assert len(report["growth_data"]["equal"]) == 3
-    assert report["growth_data"]["optimized"][0] == 100000
\ No newline at end of file
+    assert report["growth_data"]["optimized"][0] == 100000
+
+def test_simulate_batch_rolls_out_every_window(mock_model_loader):
+    """Batched rollout returns one path per starting window"""
+    mock_model_loader.model.predict.side_effect = lambda x, **kwargs: x[:, -1, :] + 0.1
+
+    simulator = MonteCarloSimulator(mock_model_loader)
+    windows = np.stack([mock_model_loader.initial_window] * 3)
+    paths = simulator.simulate_batch(windows, n_days=2, noise_std=0.0)
+
+    assert paths.shape == (3, 2, 2)
+    np.testing.assert_allclose(paths[0], [[30.0, 40.0], [40.0, 50.0]], rtol=1e-5)
+
+def test_batch_sharpe_matches_per_path(mock_model_loader, mock_simulator):
+    """Vectorized metrics agree with the per-path definitions"""
+    optimizer = PortfolioOptimizer(mock_model_loader, mock_simulator)
+    paths = mock_simulator.run_simulations(2, 3)
+    weights = np.array([0.3, 0.7])
+
+    expected_sharpe = [optimizer.evaluate_portfolio(p, weights, [0, 1]) for p in paths]
+    expected_total = [optimizer.path_total_return(p, weights, [0, 1]) for p in paths]
+
+    np.testing.assert_allclose(optimizer.batch_sharpe(paths, weights, [0, 1]), expected_sharpe)
+    np.testing.assert_allclose(optimizer.batch_total_return(paths, weights, [0, 1]), expected_total)
+
+def test_optimize_downsamples_growth(mock_model_loader, mock_simulator):
+    """Growth curves honour the requested resolution"""
+    optimizer = PortfolioOptimizer(mock_model_loader, mock_simulator)
+    full = optimizer.optimize(tickers=["AAPL", "MSFT"], total_capital=1000)
+    sampled = optimizer.optimize(tickers=["AAPL", "MSFT"], total_capital=1000,
+                                 custom_weights=[0.5, 0.5], resolution=2)
+
+    assert len(full["growth_data"]["optimized"]) == 3
+    assert len(sampled["growth_data"]["optimized"]) == 2
+    assert len(sampled["growth_data"]["custom"]) == 2
+    assert sampled["growth_data"]["optimized"][0] == 0.0
+
+def test_simulate_scenarios_batches_all_anchors(mock_model_loader):
+    """Each named scenario rolls out from its own anchor window"""
+    mock_model_loader.model.predict.side_effect = lambda x, **kwargs: x[:, -1, :]
+    mock_model_loader.scenario_names = ["latest", "crash"]
+    mock_model_loader.scenario_windows = np.stack([
+        mock_model_loader.initial_window, mock_model_loader.initial_window / 2
+    ])
+
+    simulator = MonteCarloSimulator(mock_model_loader)
+    paths = simulator.simulate_scenarios(["crash", "latest"], n_paths=3, n_days=2, noise_std=0.0)
+
+    assert list(paths) == ["crash", "latest"]
+    assert paths["crash"].shape == (3, 2, 2)
+    np.testing.assert_allclose(paths["crash"][0, 0], [10.0, 15.0], rtol=1e-5)
+    np.testing.assert_allclose(paths["latest"][0, 0], [20.0, 30.0], rtol=1e-5)
+    assert mock_model_loader.model.predict.call_count == 2
+
+    with pytest.raises(ValueError):
+        simulator.simulate_scenarios(["missing"])
+
+def test_optimize_reports_per_scenario_metrics(mock_model_loader):
+    """Scenario paths are pooled for the solve and scored per scenario"""
+    class ScenarioSimulator:
+        def simulate_scenarios(self, names, n_paths, n_days):
+            up = np.array([[100.0, 200.0], [105.0, 204.0], [111.0, 209.0]])
+            return {"bull": np.stack([up] * 2), "bear": np.stack([up[::-1]] * 2)}
+
+    optimizer = PortfolioOptimizer(mock_model_loader, ScenarioSimulator())
+    result = optimizer.optimize(tickers=["AAPL", "MSFT"], total_capital=1000, scenarios=["bull", "bear"])
+
+    assert set(result["scenarios"]) == {"bull", "bear"}
+    assert result["scenarios"]["bull"]["expected_return"] > 0
+    assert result["scenarios"]["bear"]["expected_return"] < 0
+
+def test_simulate_batch_consumes_forecast_blocks(mock_model_loader):
+    """A direct k-day model needs ceil(n_days / k) forward passes"""
+    def predict_block(x, **kwargs):
+        return x[:, -1:, :] + 0.1 * np.arange(1, 4)[None, :, None]
+    mock_model_loader.model.predict.side_effect = predict_block
+
+    simulator = MonteCarloSimulator(mock_model_loader)
+    windows = np.stack([mock_model_loader.initial_window] * 2)
+    paths = simulator.simulate_batch(windows, n_days=5, noise_std=0.0)
+
+    assert paths.shape == (2, 5, 2)
+    assert mock_model_loader.model.predict.call_count == 2
+    expected = (np.array([0.2, 0.3]) + 0.1 * np.array([1, 2, 3, 4, 5])[:, None]) * 100
+    np.testing.assert_allclose(paths[1], expected, rtol=1e-5)
@@ -10,7 +10,7 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.abspath(os.path.join(current_dir, ".."))
 sys.path.insert(0, os.path.join(project_root, "training"))
 
-from data_utils import load_and_preprocess_data, create_sequences
+from data_utils import load_and_preprocess_data, create_sequences, build_scenario_windows
 
 def test_data_loading(tmp_path):
     """Test data loading and preprocessing"""
@@ -43,4 +43,29 @@ def test_sequence_creation():
     assert np.array_equal(X[0], np.array([[1.0, 2.0], [2.0, 3.0]]))
     assert np.array_equal(y[0], np.array([3.0, 4.0]))
     assert np.array_equal(X[1], np.array([[2.0, 3.0], [3.0, 4.0]]))
-    assert np.array_equal(y[1], np.array([4.0, 5.0]))
\ No newline at end of file
+    assert np.array_equal(y[1], np.array([4.0, 5.0]))
+
+def test_scenario_windows():
+    """Scenario windows include recent anchors and stress periods"""
+    prices = np.concatenate([np.linspace(100, 120, 30), np.linspace(120, 80, 10), np.linspace(80, 90, 30)])
+    prices = np.column_stack([prices, prices * 2])
+    names, windows, end_dates = build_scenario_windows(prices, prices / 100, sequence_length=10,
+                                                       recent_offsets=(0, 5))
+
+    assert names == ["latest", "recent_5d", "high_volatility", "max_drawdown"]
+    assert windows.shape == (4, 10, 2)
+    assert windows.dtype == np.float32
+    np.testing.assert_allclose(windows[0], prices[-10:] / 100, rtol=1e-6)
+    np.testing.assert_allclose(windows[1], prices[-15:-5] / 100, rtol=1e-6)
+    # The deepest drawdown window ends at the trough
+    assert end_dates[3] == "39"
+
+def test_sequence_creation_with_forecast_block():
+    """Direct multi-step targets hold the next k days"""
+    test_data = np.arange(12.0).reshape(6, 2)
+    X, y = create_sequences(test_data, sequence_length=2, forecast_block=3)
+
+    assert X.shape == (2, 2, 2)
+    assert y.shape == (2, 3, 2)
+    np.testing.assert_array_equal(y[0], test_data[2:5])
+    np.testing.assert_array_equal(y[1], test_data[3:6])
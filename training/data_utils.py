@@ -20,10 +20,53 @@ def load_and_preprocess_data(file_path):
     
     return df, close_cols
 
-def create_sequences(data_scaled, sequence_length):
-    """Create time-series sequences for LSTM"""
+def create_sequences(data_scaled, sequence_length, forecast_block=1):
+    """Create time-series sequences for LSTM
+
+    With forecast_block > 1 each target is the next `forecast_block` days,
+    shaped (n, forecast_block, n_features).
+    """
     X, y = [], []
-    for i in range(sequence_length, len(data_scaled)):
+    for i in range(sequence_length, len(data_scaled) - forecast_block + 1):
         X.append(data_scaled[i-sequence_length:i])
-        y.append(data_scaled[i])
-    return np.array(X), np.array(y)
\ No newline at end of file
+        y.append(data_scaled[i] if forecast_block == 1 else data_scaled[i:i+forecast_block])
+    return np.array(X), np.array(y)
+
+def build_scenario_windows(prices, data_scaled, sequence_length, recent_offsets=(0, 21, 63)):
+    """Pick named anchor windows from the history for scenario simulation.
+
+    Returns (names, windows, end_dates) where windows is a stacked
+    (S, sequence_length, n_features) float32 array of scaled data:
+      - latest / recent_<k>d: the window ending k trading days before the last day
+        ("latest" is the same slice train_model.py saves as initial_window.npy)
+      - high_volatility: window with the largest realized volatility
+      - max_drawdown: window containing the deepest equal-weight drawdown
+    """
+    n_days = len(data_scaled)
+    ends = np.arange(sequence_length, n_days + 1)  # exclusive window ends
+
+    # Equal-weight index of normalized prices for the stress selections
+    values = np.asarray(prices, dtype=np.float64)
+    index = (values / values[0]).mean(axis=1)
+    rets = np.diff(index) / index[:-1]
+    # Rolling volatility / drawdown over each window (returns inside the window)
+    vol = np.array([rets[end - sequence_length:end - 1].std() for end in ends])
+    drawdown = np.array([
+        (index[end - sequence_length:end] / np.maximum.accumulate(index[end - sequence_length:end])).min()
+        for end in ends
+    ])
+
+    selected = {}
+    for k in recent_offsets:
+        if n_days - k >= sequence_length:
+            selected["latest" if k == 0 else f"recent_{k}d"] = n_days - k
+    selected["high_volatility"] = int(ends[np.argmax(vol)])
+    selected["max_drawdown"] = int(ends[np.argmin(drawdown)])
+
+    names = list(selected)
+    windows = np.stack([data_scaled[end - sequence_length:end] for end in selected.values()])
+    if hasattr(prices, "index"):
+        end_dates = [str(prices.index[end - 1].date()) for end in selected.values()]
+    else:
+        end_dates = [str(end - 1) for end in selected.values()]
+    return names, windows.astype(np.float32), end_dates
@@ -4,14 +4,17 @@ import pandas as pd
 import joblib
 import json
 import os
+import time
 import tensorflow as tf
 from sklearn.preprocessing import RobustScaler
 from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout
+from tensorflow.keras.layers import LSTM, Dense, Dropout, Reshape
 from tensorflow.keras.optimizers import Adam
 from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
 from tensorflow import keras
 
+from data_utils import build_scenario_windows, create_sequences
+
 # Configuration - same as your original parameters
 SEQUENCE_LENGTH = 60
 TRAIN_TEST_SPLIT = 0.8
@@ -24,6 +27,11 @@ LEARNING_RATE = 1e-5
 BATCH_SIZE = 32
 EPOCHS = 100
 ARTIFACTS_DIR = "../backend/artifacts"
+# Days emitted per forward pass; > 1 trains a direct multi-step head (see --block)
+FORECAST_BLOCK = 1
+# Rollout used to compare simulation speed of one-step vs direct models
+ROLLOUT_PATHS = 64
+ROLLOUT_DAYS = 75
 
 def load_and_preprocess_data(file_path):
     """Load and clean the stock data"""
@@ -42,15 +50,7 @@ def load_and_preprocess_data(file_path):
     
     return df, close_cols
 
-def create_sequences(data_scaled, sequence_length):
-    """Create time-series sequences for LSTM"""
-    X, y = [], []
-    for i in range(sequence_length, len(data_scaled)):
-        X.append(data_scaled[i-sequence_length:i])
-        y.append(data_scaled[i])
-    return np.array(X), np.array(y)
-
-def build_model(input_shape, output_units):
+def build_model(input_shape, output_units, forecast_block=1):
     """Construct the LSTM model architecture"""
     model = Sequential()
     for i, layer_config in enumerate(MODEL_LAYERS):
@@ -63,10 +63,78 @@ def build_model(input_shape, output_units):
                           return_sequences=layer_config['return_sequences']))
         model.add(Dropout(layer_config['dropout']))
     
-    model.add(Dense(units=output_units, activation='relu'))
+    if forecast_block == 1:
+        model.add(Dense(units=output_units, activation='relu'))
+    else:
+        # Direct multi-step head: the next `forecast_block` days in one call
+        model.add(Dense(units=output_units * forecast_block, activation='relu'))
+        model.add(Reshape((forecast_block, output_units)))
     return model
 
-def train_model():
+def fit_model(X_train, y_train, output_units, forecast_block=1):
+    """Build, compile and train a model"""
+    model = build_model((X_train.shape[1], X_train.shape[2]), output_units, forecast_block)
+    model.compile(optimizer=Adam(learning_rate=LEARNING_RATE), 
+                  loss='mean_squared_error')
+    
+    callbacks = [
+        EarlyStopping(monitor='loss', min_delta=1e-10, patience=10, verbose=1),
+        ReduceLROnPlateau(monitor='loss', factor=0.5, patience=10, verbose=1)
+    ]
+    
+    model.fit(
+        X_train, y_train,
+        epochs=EPOCHS,
+        batch_size=BATCH_SIZE,
+        callbacks=callbacks,
+        validation_split=0.2,
+        shuffle=True
+    )
+    return model
+
+def rollout(model, windows, n_days):
+    """Deterministic autoregressive rollout in scaled space: (B, n_days, n_features)"""
+    windows = np.array(windows, dtype=np.float32)
+    days = []
+    while sum(d.shape[1] for d in days) < n_days:
+        pred = model.predict(windows, batch_size=len(windows), verbose=0)
+        pred = np.reshape(pred, (len(windows), -1, windows.shape[-1]))
+        days.append(pred)
+        windows = np.concatenate([windows[:, pred.shape[1]:], pred], axis=1)
+    return np.concatenate(days, axis=1)[:, :n_days]
+
+def forecast_errors(model, X, y_block, scaler):
+    """MAE/RMSE in dollars over every day of the (n, k, n_features) targets"""
+    n_features = y_block.shape[-1]
+    pred = rollout(model, X, y_block.shape[1]).reshape(-1, n_features)
+    pred_actual = scaler.inverse_transform(pred)
+    true_actual = scaler.inverse_transform(y_block.reshape(-1, n_features))
+    return {
+        "MAE": float(np.mean(np.abs(true_actual - pred_actual))),
+        "RMSE": float(np.sqrt(np.mean((true_actual - pred_actual)**2))),
+    }
+
+def rollout_seconds(model, window, n_paths=ROLLOUT_PATHS, n_days=ROLLOUT_DAYS):
+    """Wall time to simulate `n_paths` x `n_days` from one window"""
+    windows = np.repeat(window[np.newaxis], n_paths, axis=0)
+    rollout(model, windows[:1], 1)  # warm up
+    start = time.perf_counter()
+    rollout(model, windows, n_days)
+    return time.perf_counter() - start
+
+def compare_forecast_block(one_step, direct, X_block_test, y_block_test, scaler, forecast_block):
+    """Accuracy over k-day forecasts and rollout speed, one-step vs direct model"""
+    report = {}
+    for name, model in (("one_step", one_step), (f"direct_{forecast_block}", direct)):
+        report[name] = forecast_errors(model, X_block_test, y_block_test, scaler)
+        report[name]["rollout_seconds"] = rollout_seconds(model, X_block_test[-1])
+        report[name]["sequential_steps"] = int(np.ceil(ROLLOUT_DAYS / (1 if model is one_step else forecast_block)))
+    report["rollout_speedup"] = (
+        report["one_step"]["rollout_seconds"] / report[f"direct_{forecast_block}"]["rollout_seconds"]
+    )
+    return report
+
+def train_model(forecast_block=FORECAST_BLOCK):
     """Main training function"""
     # Create artifacts directory
     os.makedirs(ARTIFACTS_DIR, exist_ok=True)
@@ -97,30 +165,23 @@ def train_model():
     X_train, X_test = X[:split_idx], X[split_idx:]
     y_train, y_test = y[:split_idx], y[split_idx:]
     
-    # Save the last test sequence for simulations
-    initial_window = X_test[-1]
+    # Save the most recent window (through the last day) for simulations; same as the "latest" scenario
+    initial_window = data_scaled[-SEQUENCE_LENGTH:]
     np.save(f'{ARTIFACTS_DIR}/initial_window.npy', initial_window)
+
+    # Save named anchor windows (recent days + stress periods) for scenario simulation
+    names, windows, end_dates = build_scenario_windows(df, data_scaled, SEQUENCE_LENGTH)
+    np.savez(f'{ARTIFACTS_DIR}/scenarios.npz', names=np.array(names), windows=windows,
+             end_dates=np.array(end_dates))
+    print(f"Saved {len(names)} scenarios: {', '.join(names)}")
     
     # Build and train model
-    print("Building model...")
-    model = build_model((X_train.shape[1], X_train.shape[2]), len(close_cols))
-    model.compile(optimizer=Adam(learning_rate=LEARNING_RATE), 
-                  loss='mean_squared_error')
-    
-    callbacks = [
-        EarlyStopping(monitor='loss', min_delta=1e-10, patience=10, verbose=1),
-        ReduceLROnPlateau(monitor='loss', factor=0.5, patience=10, verbose=1)
-    ]
-    
     print("Training model...")
-    history = model.fit(
-        X_train, y_train,
-        epochs=EPOCHS,
-        batch_size=BATCH_SIZE,
-        callbacks=callbacks,
-        validation_split=0.2,
-        shuffle=True
-    )
+    model = fit_model(X_train, y_train, len(close_cols))
+    
+    if forecast_block > 1:
+        train_direct_model(model, data_scaled, scaler, len(close_cols), forecast_block)
+        return
     
     # Save model
     model.save(f'{ARTIFACTS_DIR}/model.h5')
@@ -143,5 +204,47 @@ def train_model():
     
     print(f"\nArtifacts saved to {ARTIFACTS_DIR}")
 
+def train_direct_model(one_step, data_scaled, scaler, output_units, forecast_block):
+    """Train a k-day direct model, serve it as model.h5 and report it against the one-step model"""
+    X_block, y_block = create_sequences(data_scaled, SEQUENCE_LENGTH, forecast_block)
+    split_idx = int(TRAIN_TEST_SPLIT * len(X_block))
+    
+    print(f"Training direct {forecast_block}-day model...")
+    direct = fit_model(X_block[:split_idx], y_block[:split_idx], output_units, forecast_block)
+    
+    # The simulator reads the block size from the served model's output shape
+    direct.save(f'{ARTIFACTS_DIR}/model.h5')
+    one_step.save(f'{ARTIFACTS_DIR}/model_onestep.h5')
+    
+    report = compare_forecast_block(
+        one_step, direct, X_block[split_idx:], y_block[split_idx:], scaler, forecast_block
+    )
+    direct_metrics = report[f"direct_{forecast_block}"]
+    
+    print(f"\nModel Evaluation ({forecast_block}-day forecasts):")
+    for name in ("one_step", f"direct_{forecast_block}"):
+        m = report[name]
+        print(f"{name}: MAE ${m['MAE']:.2f}, RMSE ${m['RMSE']:.2f}, "
+              f"{ROLLOUT_PATHS}x{ROLLOUT_DAYS} rollout {m['rollout_seconds']:.2f}s "
+              f"({m['sequential_steps']} sequential steps)")
+    print(f"Rollout speedup: {report['rollout_speedup']:.1f}x")
+    
+    # Save evaluation metrics
+    with open(f'{ARTIFACTS_DIR}/metrics.json', 'w') as f:
+        json.dump({
+            "MAE": direct_metrics["MAE"],
+            "RMSE": direct_metrics["RMSE"],
+            "forecast_block": forecast_block,
+            "comparison": report,
+        }, f)
+    
+    print(f"\nArtifacts saved to {ARTIFACTS_DIR}")
+
 if __name__ == "__main__":
-    train_model()
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Train the LSTM price model")
+    parser.add_argument("--block", type=int, default=FORECAST_BLOCK,
+                        help="days predicted per forward pass (>1 trains a direct multi-step head)")
+    args = parser.parse_args()
+    train_model(forecast_block=args.block)
\ No newline at end of file